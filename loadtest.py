@@ -0,0 +1,111 @@
+import argparse
+import resource
+import threading
+import time
+
+from src.logger import logger, configure_logging
+from src.hubble import Hubble
+from src.fake_docker import FakeDockerClient, FakeLogSource
+from src.mock_spaceport import MockSpaceportServer
+
+def get_rss_mb():
+    with open('/proc/self/status') as file:
+        for line in file:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def main():
+
+    # get arguments
+    parser = argparse.ArgumentParser(description='Run hubble offline against a generated log stream and a mock Spaceport.')
+    parser.add_argument('--mode', choices=['Farmer', 'Node'], default='Farmer')
+    parser.add_argument('--rate', type=int, default=1000, help='log lines per second')
+    parser.add_argument('--duration', type=int, default=30, help='seconds of log stream to generate')
+    parser.add_argument('--burst-size', type=int, default=0, help='extra lines emitted at once every burst interval')
+    parser.add_argument('--burst-interval', type=float, default=10)
+    parser.add_argument('--event-ratio', type=float, default=0.5, help='share of lines that produce events')
+    parser.add_argument('--latency-ms', type=float, default=0, help='mean Spaceport response latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='share of Spaceport requests answered with HTTP 500')
+    parser.add_argument('--parse-workers', type=int, default=0)
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent Spaceport writes')
+    parser.add_argument('--drain-timeout', type=float, default=30, help='seconds to wait for sinks to drain after the stream ends')
+    args = parser.parse_args()
+
+    # mock spaceport
+    server = MockSpaceportServer(latency=args.latency_ms / 1000, error_rate=args.error_rate)
+    server.start()
+
+    config = {
+        'name': f'loadtest-{args.mode.lower()}',
+        'mode': args.mode,
+        'spaceport_url': server.url,
+        'host_ip': '127.0.0.1',
+        'parse_workers': args.parse_workers,
+        'sinks': {'spaceport': {'concurrency': args.concurrency}},
+        'dedup': {'enabled': False},
+        'logging': {'sample_interval': 10}
+    }
+
+    configure_logging(config)
+
+    source = FakeLogSource(
+        args.mode,
+        rate=args.rate,
+        duration=args.duration,
+        burst_size=args.burst_size,
+        burst_interval=args.burst_interval,
+        event_ratio=args.event_ratio
+    )
+
+    hubble = Hubble(config, docker_client=FakeDockerClient(args.mode, source))
+    hubble.get_container()
+
+    if config.get('parse_workers'):
+        from src.parallel_parser import ParallelParser
+        hubble.parallel_parser = ParallelParser(config['name'], config['mode'], config['parse_workers'])
+
+    hubble.event_bus.start()
+
+    rss_start = get_rss_mb()
+    started = time.monotonic()
+    threading.Thread(target=hubble.log_stream_monitor, name='log-stream', daemon=True).start()
+
+    # wait for the stream to end, then for the sinks to drain
+    source.finished.wait()
+    stream_elapsed = time.monotonic() - started
+
+    deadline = time.monotonic() + args.drain_timeout
+    while time.monotonic() < deadline:
+        metrics = hubble.event_bus.metrics()
+        if all(sink['queued'] == 0 for sink in metrics.values()) and server.events + server.errors >= source.events:
+            break
+        time.sleep(0.1)
+
+    total_elapsed = time.monotonic() - started
+    rss_end = get_rss_mb()
+    metrics = hubble.event_bus.metrics()
+
+    logger.info('Load test results:')
+    logger.info(f'  lines generated        {source.lines:,} in {stream_elapsed:.1f}s ({source.lines / stream_elapsed:,.0f} lines/s)')
+    logger.info(f'  events generated       {source.events:,}')
+    logger.info(f'  events received        {server.events:,} ({server.events / total_elapsed:,.0f} events/s sustained)')
+    logger.info(f'  events dropped         {max(0, source.events - server.events):,} ({server.errors:,} Spaceport errors)')
+    logger.info(f'  end-to-end lag         p50 {percentile(server.lags, 50):.3f}s, p95 {percentile(server.lags, 95):.3f}s, max {percentile(server.lags, 100):.3f}s')
+    logger.info(f'  memory                 {rss_start:.1f} MB -> {rss_end:.1f} MB ({rss_end - rss_start:+.1f} MB)')
+
+    for name, sink in metrics.items():
+        logger.info(f"  sink {name:<17} delivered {sink['delivered']:,}, dropped {sink['dropped']:,}, failed {sink['failed']:,}, max lag {sink['max_lag']:.3f}s")
+
+    hubble.event_bus.stop()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
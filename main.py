@@ -1,10 +1,14 @@
+import time
+STARTED_AT = time.perf_counter()
+
 import argparse
 import sys
 
-from src.logger import logger
+from src.logger import logger, configure_logging
 
 from src.helpers import Helpers
 from src.hubble import Hubble
+from src.startup_timer import StartupTimer
 
 def main():
 
@@ -12,31 +16,28 @@ def main():
     parser = argparse.ArgumentParser(description='Load and print YAML configuration.')
     parser.add_argument('config_file', metavar='config_file.yml', type=str,
                         help='path to the YAML configuration file')
+    parser.add_argument('--timing', action='store_true',
+                        help='print a startup timing report before streaming logs')
     args = parser.parse_args()
 
-    # parse config
-    config = Helpers.read_yaml_file(args.config_file)
+    timer = StartupTimer(STARTED_AT) if args.timing else None
+    if timer:
+        timer.mark('imports')
 
-    # check if a config file was able to be loaded, if not throw error and exit
+    # parse and validate config
+    config = Helpers.load_config(args.config_file)
     if not config:
-        logger.error(f'Error loading config from {args.config_file}. Are you sure you put in the right location?')
-        sys.exit(1)
-
-    missing_values = False
-    for key, value in config.items():
-        if value is None:
-            logger.error(f"None value found at key: {key}")
-            missing_values = True
-
-    if missing_values:
         sys.exit(1)
 
-       
     # config looks good, proceed
+    configure_logging(config)
     logger.info(f'Configuration loaded successfully: {config}')
+    if timer:
+        timer.mark('load config')
 
     # run hubble
-    hubble = Hubble(config)
+    hubble = Hubble(config, timer=timer, config_path=args.config_file)
+    hubble.mark_startup('docker client')
     hubble.run()
 
 if __name__ == "__main__":
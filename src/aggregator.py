@@ -0,0 +1,350 @@
+import json
+import os
+import queue
+import random
+import socket
+import struct
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+from src.event_bus import Sink
+from src.helpers import Helpers
+from src.logger import logger
+from src.serializer import dumps
+
+# Frame header: payload length, frame type, sequence number
+FRAME_HEADER = struct.Struct('!IBQ')
+
+FRAME_HELLO = 1
+FRAME_EVENT = 2
+FRAME_SYNC = 3
+FRAME_ACK = 4
+FRAME_REGISTER = 5
+
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+# Frames are not authenticated and are written straight to Spaceport, so only local agents are
+# accepted unless aggregator_listen is set to a wider address on a trusted network
+DEFAULT_LISTEN = 'tcp://127.0.0.1:7878'
+
+def encode_frame(frame_type, sequence, payload=b'') -> bytes:
+    return FRAME_HEADER.pack(len(payload), frame_type, sequence) + payload
+
+def read_frame(file):
+    header = file.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        raise ConnectionError('Connection closed')
+
+    length, frame_type, sequence = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ConnectionError(f'Frame of {length} bytes exceeds the maximum frame size')
+
+    payload = file.read(length)
+    if len(payload) < length:
+        raise ConnectionError('Connection closed')
+
+    return frame_type, sequence, payload
+
+# Addresses are tcp://host:port or unix:///path/to/socket
+def parse_address(address):
+    if address.startswith('unix://'):
+        return socket.AF_UNIX, address[len('unix://'):]
+
+    if address.startswith('tcp://'):
+        host, port = address[len('tcp://'):].rsplit(':', 1)
+        return socket.AF_INET, (host, int(port))
+
+    raise ValueError(f'Unsupported aggregator address {address}')
+
+def open_connection(address, timeout=10):
+    family, target = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    sock.connect(target)
+    sock.settimeout(None)
+
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    return sock
+
+
+class AggregatorSink(Sink):
+    name = 'aggregator'
+
+    def __init__(self, config, options=None) -> None:
+        options = dict(options or {})
+        options.setdefault('full_policy', 'block')
+        options.setdefault('batch_size', 200)
+        options.setdefault('batch_wait', 0.05)
+        super().__init__(options)
+
+        self.address = options.get('address')
+        self.agent = config.get('name')
+
+        # The session lets the aggregator tell a reconnect apart from an agent restart
+        self.session = uuid.uuid4().hex
+        self.sequence = 0
+        self.max_unacked = options.get('max_unacked', 10000)
+        self.unacked = OrderedDict()
+        self.condition = threading.Condition()
+
+        # Agents without a Spaceport sink are registered by the aggregator, sent after every hello
+        self.registration = None
+        self.registration_pending = False
+
+        self.sock = None
+        self.backoff = 1
+
+    def register(self, mode, docker_data, host_ip=None) -> None:
+        with self.condition:
+            self.registration = encode_frame(FRAME_REGISTER, 0, dumps({
+                'name': self.agent,
+                'mode': mode,
+                'docker_data': docker_data,
+                'host_ip': host_ip
+            }))
+            self.registration_pending = True
+
+    # A new name is announced on the next connect, the session and unacked frames are kept
+    def reconfigure(self, config, rate_limiter) -> None:
+        self.agent = config.get('name')
+
+    # Connect and resend everything that was not acknowledged yet, in order
+    def _connect(self) -> None:
+        while True:
+            try:
+                sock = open_connection(self.address)
+                hello = dumps({'agent': self.agent, 'session': self.session})
+
+                with self.condition:
+                    frames = list(self.unacked.values())
+                    last = next(reversed(self.unacked), 0)
+                    if self.registration:
+                        frames.insert(0, self.registration)
+                        self.registration_pending = False
+
+                sock.sendall(encode_frame(FRAME_HELLO, 0, hello) + b''.join(frames) + encode_frame(FRAME_SYNC, last))
+
+                self.sock = sock
+                self.backoff = 1
+                threading.Thread(target=self._read_acks, args=(sock,), name='aggregator-acks', daemon=True).start()
+                logger.info(f'Connected to aggregator {self.address}, resent {len(frames)} unacknowledged events')
+                return
+
+            except OSError as e:
+                delay = random.uniform(0, self.backoff)
+                logger.warning(f'Unable to connect to aggregator {self.address}: {e}. Retrying in {delay:.1f}s')
+                time.sleep(delay)
+                self.backoff = min(self.backoff * 2, 30)
+
+    def _read_acks(self, sock) -> None:
+        try:
+            file = sock.makefile('rb')
+            while True:
+                frame_type, sequence, _ = read_frame(file)
+                if frame_type != FRAME_ACK:
+                    continue
+
+                # Acks are cumulative
+                with self.condition:
+                    while self.unacked and next(iter(self.unacked)) <= sequence:
+                        self.unacked.popitem(last=False)
+                    self.condition.notify_all()
+
+        except (OSError, ConnectionError) as e:
+            logger.warning(f'Lost connection to aggregator {self.address}: {e}')
+
+        finally:
+            self._disconnect(sock)
+
+    def _disconnect(self, sock) -> None:
+        if self.sock is sock:
+            self.sock = None
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def write_batch(self, events) -> None:
+        with self.condition:
+            while len(self.unacked) >= self.max_unacked:
+                self.condition.wait(1)
+                if self.sock is None:
+                    break
+
+            frames = []
+            if self.registration_pending and self.sock is not None:
+                frames.append(self.registration)
+                self.registration_pending = False
+
+            for event in events:
+                self.sequence += 1
+                frame = encode_frame(FRAME_EVENT, self.sequence, dumps(event))
+                self.unacked[self.sequence] = frame
+                frames.append(frame)
+
+            frames.append(encode_frame(FRAME_SYNC, self.sequence))
+
+        sock = self.sock
+        if sock is None:
+            self._connect()
+            return
+
+        try:
+            sock.sendall(b''.join(frames))
+        except OSError as e:
+            logger.warning(f'Lost connection to aggregator {self.address}: {e}')
+            self._disconnect(sock)
+            self._connect()
+
+    def metrics(self):
+        metrics = super().metrics()
+        metrics['unacked'] = len(self.unacked)
+        return metrics
+
+    def close(self) -> None:
+        if self.sock:
+            self._disconnect(self.sock)
+
+
+class AggregatorServer:
+    # With an event bus, acks wait until every sink has handled the acknowledged events,
+    # without one they only mean the events were received
+    def __init__(self, address, handle_event, report_interval=60, event_bus=None, register=None) -> None:
+        self.address = address
+        self.handle_event = handle_event
+        self.register = register
+        self.report_interval = report_interval
+        self.event_bus = event_bus
+
+        self.agents = {}
+        self.lock = threading.Lock()
+
+    def serve_forever(self) -> None:
+        family, target = parse_address(self.address)
+        server = socket.socket(family, socket.SOCK_STREAM)
+
+        if family == socket.AF_UNIX:
+            if os.path.exists(target):
+                os.remove(target)
+        else:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if target[0] not in ['127.0.0.1', 'localhost', '::1']:
+                logger.warning(f'Aggregator accepts unauthenticated events from any host that can reach {self.address}, restrict it with a firewall or a private network')
+
+        server.bind(target)
+        server.listen()
+        logger.info(f'Aggregator listening on {self.address}')
+
+        threading.Thread(target=self._report_loop, name='aggregator-report', daemon=True).start()
+
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=self._handle_connection, args=(conn,), name='aggregator-agent', daemon=True).start()
+
+    def _handle_connection(self, conn) -> None:
+        agent = None
+        state = None
+        acks = queue.Queue()
+        try:
+            file = conn.makefile('rb')
+            frame_type, _, payload = read_frame(file)
+            if frame_type != FRAME_HELLO:
+                raise ConnectionError('Expected a hello frame')
+
+            hello = json.loads(payload)
+            agent = hello.get('agent')
+
+            with self.lock:
+                state = self.agents.get(agent)
+                if state is None or state['session'] != hello.get('session'):
+                    state = {'session': hello.get('session'), 'last_sequence': 0, 'acked': 0, 'received': 0, 'duplicates': 0, 'lag': 0.0}
+                    self.agents[agent] = state
+                state['connected'] = True
+
+            logger.info(f'Aggregator: agent {agent} connected')
+            threading.Thread(target=self._ack_loop, args=(conn, agent, state, acks), name='aggregator-acks', daemon=True).start()
+
+            while True:
+                frame_type, sequence, payload = read_frame(file)
+
+                if frame_type == FRAME_EVENT:
+                    # Frames resent after a reconnect are dropped by sequence number
+                    if sequence <= state['last_sequence']:
+                        state['duplicates'] += 1
+                        continue
+
+                    event = json.loads(payload)
+                    self.handle_event(event)
+
+                    state['last_sequence'] = sequence
+                    state['received'] += 1
+                    try:
+                        state['lag'] = Helpers.get_event_lag(event)
+                    except Exception:
+                        pass
+
+                elif frame_type == FRAME_REGISTER:
+                    if self.register:
+                        self.register(json.loads(payload))
+
+                elif frame_type == FRAME_SYNC:
+                    mark = self.event_bus.mark() if self.event_bus else None
+                    acks.put((mark, state['last_sequence']))
+
+        except (OSError, ConnectionError, ValueError) as e:
+            logger.warning(f'Aggregator: agent {agent} disconnected: {e}')
+
+        finally:
+            acks.put(None)
+            if state is not None:
+                # Anything not acknowledged is resent by the agent and must be accepted again
+                state['connected'] = False
+                state['last_sequence'] = state['acked']
+            conn.close()
+
+    # Acks are sent once the sinks got past the events they cover. If any sink failed or dropped
+    # events meanwhile, the connection is closed instead so the agent resends all unacknowledged
+    # events, which makes delivery at-least-once through to Spaceport rather than to this process
+    def _ack_loop(self, conn, agent, state, acks) -> None:
+        losses = self.event_bus.losses() if self.event_bus else 0
+
+        while True:
+            entry = acks.get()
+            if entry is None:
+                return
+
+            mark, sequence = entry
+            if self.event_bus:
+                while not self.event_bus.settled(mark):
+                    if not state.get('connected'):
+                        return
+                    time.sleep(0.05)
+
+                current = self.event_bus.losses()
+                if current > losses:
+                    logger.warning(f'Aggregator: {current - losses} event(s) failed in the sinks, asking agent {agent} to resend from #{state["acked"] + 1}')
+                    try:
+                        conn.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+                    return
+
+            try:
+                conn.sendall(encode_frame(FRAME_ACK, sequence))
+                state['acked'] = sequence
+            except OSError:
+                return
+
+    def _report_loop(self) -> None:
+        while True:
+            time.sleep(self.report_interval)
+            with self.lock:
+                agents = list(self.agents.items())
+
+            for agent, state in agents:
+                status = 'connected' if state.get('connected') else 'disconnected'
+                logger.info(f"Aggregator: agent {agent} {status}, {state['received']:,} events, {state['duplicates']:,} duplicates, lag {state['lag']:.1f}s")
@@ -0,0 +1,134 @@
+import collections
+import threading
+import time
+
+# Singular and plural labels used in digest lines
+LABELS = {
+    'Reward': ('reward', 'rewards'),
+    'Failed to Send Solution': ('failed solution', 'failed solutions'),
+    'Plotting Complete': ('plotting complete', 'plotting complete'),
+    'Replotting Complete': ('replotting complete', 'replotting complete'),
+    'Starting Workers': ('start', 'starts'),
+    'Vote': ('vote', 'votes'),
+    'Block': ('block', 'blocks')
+}
+
+TITLES = {
+    'reward': 'Rewards Digest',
+    'plot': 'Plotting Digest',
+    'farm': 'Farm Digest',
+    'farmer': 'Farmer Digest',
+    'node': 'Node Digest',
+    'general': 'Digest',
+    'error': 'Error Digest'
+}
+
+def format_window(seconds):
+    if seconds % 3600 == 0:
+        return f'{seconds // 3600} h'
+    if seconds % 60 == 0:
+        return f'{seconds // 60} min'
+    return f'{seconds} s'
+
+
+class DigestWindow:
+    def __init__(self, alert_type, seconds) -> None:
+        self.alert_type = alert_type
+        self.seconds = seconds
+        self.opened_at = None
+
+        # (name, farm index) -> event type -> count, plus a few slots per source
+        self.counts = collections.OrderedDict()
+        self.slots = {}
+
+    def add(self, event) -> None:
+        if self.opened_at is None:
+            self.opened_at = time.monotonic()
+
+        data = event.get('Data') or {}
+
+        # Reward events carry the farm index as a string, others as an int
+        farm_index = data.get('Farm Index')
+        source = (event.get('Farmer Name') or event.get('Node Name'), int(farm_index) if farm_index is not None else None)
+        counts = self.counts.setdefault(source, collections.Counter())
+        counts[event.get('Event Type')] += 1
+
+        if data.get('Slot') is not None:
+            self.slots.setdefault(source, []).append(data.get('Slot'))
+
+    def due(self) -> bool:
+        return self.opened_at is not None and time.monotonic() - self.opened_at >= self.seconds
+
+    def summarize(self, max_details=5):
+        lines = []
+        for (name, farm_index), counts in self.counts.items():
+            parts = []
+            for event_type, count in counts.items():
+                singular, plural = LABELS.get(event_type, (event_type.lower(), event_type.lower()))
+                parts.append(f'{count} {singular if count == 1 else plural}')
+
+            slots = self.slots.get((name, farm_index))
+            if slots:
+                shown = ', '.join(str(slot) for slot in slots[:max_details])
+                more = f' +{len(slots) - max_details} more' if len(slots) > max_details else ''
+                parts[-1] += f' (slots {shown}{more})'
+
+            source = f'{name} farm {farm_index}' if farm_index is not None else name
+            lines.append(f"{source}: {', '.join(parts)}")
+
+        lines.append(f'in the last {format_window(self.seconds)}')
+        return '\n'.join(lines)
+
+    def reset(self) -> None:
+        self.opened_at = None
+        self.counts = collections.OrderedDict()
+        self.slots = {}
+
+
+class AlertDigest:
+    # Bursty alert types are counted per window and sent as one summary, urgent event types bypass it
+    def __init__(self, config, send) -> None:
+        self.send = send
+        self.windows = {alert_type: DigestWindow(alert_type, int(seconds)) for alert_type, seconds in (config.get('windows') or {}).items() if seconds}
+        self.urgent = set(config.get('urgent', ['Starting Workers']))
+        self.max_details = config.get('max_details', 5)
+
+        # The sink worker adds and flushes, a config reload closes the digest from its own thread
+        self.lock = threading.Lock()
+        self.closed = False
+
+    # Returns True when the alert was held for a digest, a closed digest holds nothing
+    def add(self, event, alert_type) -> bool:
+        window = self.windows.get(alert_type)
+        if window is None or event.get('Event Type') in self.urgent:
+            return False
+
+        with self.lock:
+            if self.closed:
+                return False
+            window.add(event)
+            return True
+
+    def flush_due(self) -> None:
+        self._send_all(lambda window: window.due())
+
+    def flush_all(self) -> None:
+        self._send_all(lambda window: window.counts)
+
+    # Send whatever is held and let later alerts bypass the digest
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+        self.flush_all()
+
+    # Summaries are taken under the lock and sent outside it, sending may wait on the rate limiter
+    def _send_all(self, ready) -> None:
+        with self.lock:
+            summaries = []
+            for window in self.windows.values():
+                if ready(window):
+                    summaries.append((window.alert_type, window.summarize(self.max_details)))
+                    window.reset()
+
+        for alert_type, message in summaries:
+            self.send(alert_type, TITLES.get(alert_type, 'Digest'), message)
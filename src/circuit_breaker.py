@@ -0,0 +1,87 @@
+import threading
+import time
+
+from collections import deque
+from src.logger import logger
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30, half_open_max_calls=1) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.transitions = deque(maxlen=50)
+        self.lock = threading.Lock()
+
+    # Returns False while open so callers can fail fast without any I/O
+    def allow_request(self) -> bool:
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self._transition(self.HALF_OPEN)
+
+            # Half-open lets a limited number of trial requests through
+            if self.half_open_calls < self.half_open_max_calls:
+                self.half_open_calls += 1
+                return True
+
+            return False
+
+    # Same answer as allow_request without using up a half-open trial call
+    def available(self) -> bool:
+        with self.lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at >= self.reset_timeout
+            if self.state == self.HALF_OPEN:
+                return self.half_open_calls < self.half_open_max_calls
+            return True
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self._transition(self.OPEN)
+                self.opened_at = time.monotonic()
+
+    def _transition(self, state) -> None:
+        previous = self.state
+        self.state = state
+        self.half_open_calls = 0
+        self.transitions.append((time.time(), previous, state))
+
+        if state == self.OPEN:
+            logger.warning(f'Circuit for {self.name} opened after {self.failures} failures. Failing fast for {self.reset_timeout}s')
+        else:
+            logger.info(f'Circuit for {self.name} changed from {previous} to {state}')
+
+    def status(self):
+        with self.lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'transitions': list(self.transitions)
+            }
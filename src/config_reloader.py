@@ -0,0 +1,67 @@
+import os
+import signal
+import threading
+
+from src.helpers import Helpers
+from src.logger import logger
+
+class ConfigReloader:
+    def __init__(self, config_path, apply, interval=5) -> None:
+        self.config_path = config_path
+        self.apply = apply
+        self.interval = interval
+
+        self.requested = threading.Event()
+        self.last_mtime = self._mtime()
+        self.running = False
+
+    def _mtime(self):
+        try:
+            return os.stat(self.config_path).st_mtime
+        except OSError:
+            return None
+
+    def start(self) -> None:
+        self.running = True
+
+        # Signal handlers can only be installed from the main thread
+        if threading.current_thread() is threading.main_thread() and hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self.signal_handler)
+
+        threading.Thread(target=self._watch_loop, name='config-reloader', daemon=True).start()
+        logger.info(f'Watching {self.config_path} for changes')
+
+    def stop(self) -> None:
+        self.running = False
+        self.requested.set()
+
+    # The handler only wakes the watcher, the reload itself runs off the log stream thread
+    def signal_handler(self, sig, frame) -> None:
+        self.requested.set()
+
+    def _watch_loop(self) -> None:
+        while self.running:
+            signaled = self.requested.wait(self.interval)
+            self.requested.clear()
+            if not self.running:
+                break
+
+            mtime = self._mtime()
+            if not signaled and (mtime is None or mtime == self.last_mtime):
+                continue
+
+            self.last_mtime = mtime
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error('Error reloading config:', exc_info=e)
+
+    # An invalid file keeps the running config in place
+    def reload(self) -> None:
+        logger.info(f'Reloading config from {self.config_path}')
+        config = Helpers.load_config(self.config_path)
+        if not config:
+            logger.error('Config reload failed, keeping the current config')
+            return
+
+        self.apply(config)
@@ -25,4 +25,7 @@ KEY_EVENTS = [
     'Idle',                                     #17
     'Claimed vote',                             #18
     'Claimed block'
-]
\ No newline at end of file
+]
+
+# Docker emits this line when log rotation breaks the stream
+BROKEN_STREAM_LOG = b"Error grabbing logs: invalid character 'l' after object key:value pair"
@@ -0,0 +1,165 @@
+import datetime
+import threading
+import time
+
+from src.helpers import Helpers
+from src.logger import logger
+
+def parse_stats_time(value):
+    # Docker reports nanosecond timestamps, seconds are enough for rates
+    try:
+        return Helpers.parse_event_datetime(value).timestamp()
+    except Exception:
+        return time.time()
+
+def sum_network(stats):
+    rx = tx = 0
+    for interface in (stats.get('networks') or {}).values():
+        rx += interface.get('rx_bytes', 0)
+        tx += interface.get('tx_bytes', 0)
+    return rx, tx
+
+def sum_block_io(stats):
+    read = write = 0
+    for entry in (stats.get('blkio_stats') or {}).get('io_service_bytes_recursive') or []:
+        op = entry.get('op', '').lower()
+        if op == 'read':
+            read += entry.get('value', 0)
+        elif op == 'write':
+            write += entry.get('value', 0)
+    return read, write
+
+def memory_usage(stats):
+    memory = stats.get('memory_stats') or {}
+    detail = memory.get('stats') or {}
+
+    # Page cache is reclaimable, the docker CLI leaves it out as well
+    cache = detail.get('inactive_file', detail.get('cache', 0))
+    return max(0, memory.get('usage', 0) - cache), memory.get('limit', 0)
+
+
+class StatsWindow:
+    def __init__(self) -> None:
+        self.samples = 0
+        self.cpu_samples = 0
+        self.cpu_total = 0.0
+        self.cpu_max = 0.0
+        self.memory = 0
+        self.memory_max = 0
+        self.memory_limit = 0
+
+    def add(self, cpu, memory, memory_limit) -> None:
+        self.samples += 1
+
+        # The first sample after connecting has nothing to compare CPU time against
+        if cpu is not None:
+            self.cpu_samples += 1
+            self.cpu_total += cpu
+            self.cpu_max = max(self.cpu_max, cpu)
+        self.memory = memory
+        self.memory_max = max(self.memory_max, memory)
+        self.memory_limit = memory_limit
+
+
+class ContainerStatsCollector:
+    def __init__(self, container, name, mode, publish, interval=60) -> None:
+        self.container = container
+        self.name = name
+        self.mode = mode
+        self.publish = publish
+        self.interval = interval
+
+        self.previous = None
+        self.window = StatsWindow()
+        self.window_started = None
+        self.window_counters = None
+
+        self.running = False
+
+    def start(self) -> None:
+        self.running = True
+        threading.Thread(target=self._stream_loop, name='container-stats', daemon=True).start()
+        logger.info(f'Collecting container stats every {self.interval}s')
+
+    def stop(self) -> None:
+        self.running = False
+
+    # One persistent stats stream, docker pushes a sample about every second
+    def _stream_loop(self) -> None:
+        delay = 1
+        while self.running:
+            try:
+                for stats in self.container.stats(stream=True, decode=True):
+                    if not self.running:
+                        return
+                    self.observe(stats)
+                    delay = 1
+
+            except Exception as e:
+                logger.error('Error in container stats stream:', exc_info=e)
+
+            # The stream ends when the container stops, reconnect with backoff
+            self.previous = None
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    def observe(self, stats) -> None:
+        now = parse_stats_time(stats.get('read'))
+        cpu = stats.get('cpu_stats') or {}
+        counters = (now, *sum_network(stats), *sum_block_io(stats))
+
+        # CPU is a share of host time between two consecutive samples
+        cpu_percent = None
+        if self.previous:
+            cpu_delta = cpu.get('cpu_usage', {}).get('total_usage', 0) - self.previous['cpu_usage']
+            system_delta = cpu.get('system_cpu_usage', 0) - self.previous['system_cpu_usage']
+            online_cpus = cpu.get('online_cpus') or len(cpu.get('cpu_usage', {}).get('percpu_usage') or []) or 1
+            cpu_percent = 0.0
+            if cpu_delta > 0 and system_delta > 0:
+                cpu_percent = cpu_delta / system_delta * online_cpus * 100
+
+        self.previous = {
+            'cpu_usage': cpu.get('cpu_usage', {}).get('total_usage', 0),
+            'system_cpu_usage': cpu.get('system_cpu_usage', 0)
+        }
+
+        if self.window_started is None:
+            self.window_started = now
+            self.window_counters = counters
+
+        self.window.add(cpu_percent, *memory_usage(stats))
+
+        if now - self.window_started >= self.interval:
+            self.flush(counters)
+
+    # I/O rates come from the counter deltas across the whole window
+    def flush(self, counters) -> None:
+        window = self.window
+        started = self.window_counters
+        elapsed = max(counters[0] - started[0], 1e-6)
+        rx, tx, read, write = [max(0, end - start) / elapsed for start, end in zip(started[1:], counters[1:])]
+
+        self.publish({
+            'Event Type': 'Container Stats',
+            'Level': 'INFO',
+            'Age': 0,
+            'Datetime': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S.%f'),
+            f'{self.mode} Name': self.name,
+            'Data': {
+                'Interval': round(elapsed, 1),
+                'Samples': window.samples,
+                'CPU Percent': round(window.cpu_total / window.cpu_samples, 2) if window.cpu_samples else None,
+                'CPU Percent Max': round(window.cpu_max, 2),
+                'Memory Bytes': window.memory,
+                'Memory Bytes Max': window.memory_max,
+                'Memory Limit': window.memory_limit,
+                'Network Rx Rate': round(rx, 1),
+                'Network Tx Rate': round(tx, 1),
+                'Block Read Rate': round(read, 1),
+                'Block Write Rate': round(write, 1)
+            }
+        })
+
+        self.window = StatsWindow()
+        self.window_started = counters[0]
+        self.window_counters = counters
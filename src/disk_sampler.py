@@ -0,0 +1,190 @@
+import datetime
+import os
+import threading
+import time
+
+from src.logger import logger
+
+# /proc/diskstats always counts 512 byte sectors
+SECTOR_SIZE = 512
+
+def read_diskstats(path='/proc/diskstats'):
+    # (major, minor) -> (reads, sectors read, writes, sectors written, ms doing I/O)
+    stats = {}
+    with open(path) as file:
+        for line in file:
+            fields = line.split()
+            if len(fields) < 13:
+                continue
+            stats[(int(fields[0]), int(fields[1]))] = (
+                int(fields[3]), int(fields[5]), int(fields[7]), int(fields[9]), int(fields[12])
+            )
+    return stats
+
+def read_mountinfo(path='/proc/self/mountinfo'):
+    # mount point -> (major, minor), used when the farm path itself can not be stat'ed
+    mounts = {}
+    with open(path) as file:
+        for line in file:
+            fields = line.split()
+            major, minor = fields[2].split(':')
+            mounts[fields[4].replace('\\040', ' ')] = (int(major), int(minor))
+    return mounts
+
+def longest_prefix(path, prefixes):
+    best = None
+    for prefix in prefixes:
+        if path == prefix or path.startswith(prefix.rstrip('/') + '/'):
+            if best is None or len(prefix) > len(best):
+                best = prefix
+    return best
+
+
+class FarmDisk:
+    def __init__(self, farm_index, directory) -> None:
+        self.farm_index = farm_index
+        self.directory = directory
+        self.host_path = None
+        self.device = None
+        self.sectors = 0
+        self.rewards = 0
+
+
+class FarmDiskSampler:
+    def __init__(self, farmer_name, mounts, publish, interval=30, host_prefix='') -> None:
+        self.farmer_name = farmer_name
+        self.publish = publish
+        self.interval = interval
+        self.host_prefix = host_prefix.rstrip('/')
+
+        # container destination -> host source, farm directories are reported as container paths
+        self.mounts = {mount.get('Destination'): mount.get('Source') for mount in mounts or [] if mount.get('Destination')}
+
+        self.farms = {}
+        self.previous = None
+        self.previous_time = None
+        self.lock = threading.Lock()
+        self.running = False
+
+    def start(self) -> None:
+        self.running = True
+        threading.Thread(target=self._sample_loop, name='disk-sampler', daemon=True).start()
+        logger.info(f'Sampling farm disks every {self.interval}s')
+
+    def stop(self) -> None:
+        self.running = False
+
+    # Farm directories come from the log, plotting and reward events are counted per farm
+    def observe(self, event) -> None:
+        event_type = event.get('Event Type')
+        data = event.get('Data') or {}
+        farm_index = data.get('Farm Index')
+        if farm_index is None:
+            return
+
+        with self.lock:
+            if event_type == 'Farm Directory':
+                farm = FarmDisk(int(farm_index), data.get('Farm Directory'))
+                self.resolve(farm)
+                self.farms[farm.farm_index] = farm
+                return
+
+            farm = self.farms.get(int(farm_index))
+            if farm is None:
+                return
+
+            if event_type in ['Plotting Sector', 'Replotting Sector']:
+                farm.sectors += 1
+            elif event_type == 'Reward':
+                farm.rewards += 1
+
+    def host_path(self, directory):
+        destination = longest_prefix(directory, self.mounts)
+        if destination is None:
+            return self.host_prefix + directory
+        return self.host_prefix + self.mounts[destination] + directory[len(destination.rstrip('/')):]
+
+    def resolve(self, farm) -> None:
+        farm.host_path = self.host_path(farm.directory)
+        try:
+            st_dev = os.stat(farm.host_path).st_dev
+            farm.device = (os.major(st_dev), os.minor(st_dev))
+        except OSError:
+            mounts = read_mountinfo()
+            mount_point = longest_prefix(farm.host_path, mounts)
+            if mount_point is not None:
+                farm.device = mounts[mount_point]
+
+        if farm.device is None:
+            logger.warning(f'Unable to find the block device for farm {farm.farm_index} at {farm.host_path}')
+
+    def _sample_loop(self) -> None:
+        while self.running:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error('Error sampling farm disks:', exc_info=e)
+            time.sleep(self.interval)
+
+    def sample(self) -> None:
+        now = time.monotonic()
+        diskstats = read_diskstats()
+        previous = self.previous
+        elapsed = now - self.previous_time if self.previous_time else None
+        self.previous = diskstats
+        self.previous_time = now
+
+        with self.lock:
+            farms = list(self.farms.values())
+            counts = [(farm.sectors, farm.rewards) for farm in farms]
+            for farm in farms:
+                farm.sectors = farm.rewards = 0
+
+        if not previous or not elapsed:
+            return
+
+        records = []
+        for farm, (sectors, rewards) in zip(farms, counts):
+            record = {
+                'Farm Index': farm.farm_index,
+                'Farm Directory': farm.directory,
+                'Sectors Plotted': sectors,
+                'Rewards': rewards
+            }
+
+            # Several farms on one disk share its throughput, the device is reported so they can be grouped
+            current, before = diskstats.get(farm.device), previous.get(farm.device)
+            if current and before:
+                reads, sectors_read, writes, sectors_written, io_ms = [end - start for start, end in zip(before, current)]
+                record.update({
+                    'Device': f'{farm.device[0]}:{farm.device[1]}',
+                    'Read Rate': round(sectors_read * SECTOR_SIZE / elapsed, 1),
+                    'Write Rate': round(sectors_written * SECTOR_SIZE / elapsed, 1),
+                    'Read IOPS': round(reads / elapsed, 1),
+                    'Write IOPS': round(writes / elapsed, 1),
+                    'Busy Percent': round(min(100.0, io_ms / 10 / elapsed), 1)
+                })
+
+            try:
+                fs = os.statvfs(farm.host_path)
+                record['Free Space'] = fs.f_bavail * fs.f_frsize
+                record['Total Space'] = fs.f_blocks * fs.f_frsize
+            except OSError:
+                pass
+
+            records.append(record)
+
+        if not records:
+            return
+
+        self.publish({
+            'Event Type': 'Farm Disk Stats',
+            'Level': 'INFO',
+            'Age': 0,
+            'Datetime': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S.%f'),
+            'Farmer Name': self.farmer_name,
+            'Data': {
+                'Interval': round(elapsed, 1),
+                'Farms': records
+            }
+        })
@@ -0,0 +1,255 @@
+import calendar
+import re
+import requests
+import threading
+import time
+
+import src.constants as constants
+
+from src.log_parser import LogParser
+from src.logger import logger
+
+IMAGES = {
+    'Farmer': 'subspace/farmer',
+    'Node': 'subspace/node'
+}
+
+# RFC 3339 prefix the daemon adds to each line when logs are requested with timestamps=True
+DOCKER_TIMESTAMP = re.compile(rb'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.(\d{1,9}))?Z ')
+
+# Returns the daemon time of the line in nanoseconds and the line without the prefix
+def split_docker_timestamp(line):
+    match = DOCKER_TIMESTAMP.match(line)
+    if match is None:
+        return None, line
+
+    seconds = calendar.timegm(time.strptime(match.group(1).decode('ascii'), '%Y-%m-%dT%H:%M:%S'))
+    nanoseconds = int((match.group(2) or b'0').ljust(9, b'0'))
+    return seconds * 1000000000 + nanoseconds, line[match.end():]
+
+class ContainerMissing(Exception):
+    pass
+
+# Only transport and daemon errors mean the shared client is broken, a missing container does not
+def is_host_error(error):
+    if isinstance(error, requests.exceptions.RequestException):
+        return True
+
+    try:
+        from docker.errors import DockerException, NotFound
+    except ImportError:
+        return False
+
+    return isinstance(error, DockerException) and not isinstance(error, NotFound)
+
+def is_missing_container(error):
+    if isinstance(error, ContainerMissing):
+        return True
+
+    try:
+        from docker.errors import NotFound
+    except ImportError:
+        return False
+
+    return isinstance(error, NotFound)
+
+def create_docker_client(host_config):
+    import docker
+
+    tls = None
+    tls_config = host_config.get('tls')
+    if tls_config:
+        client_cert = None
+        if tls_config.get('client_cert'):
+            client_cert = (tls_config.get('client_cert'), tls_config.get('client_key'))
+        tls = docker.tls.TLSConfig(
+            client_cert=client_cert,
+            ca_cert=tls_config.get('ca_cert'),
+            verify=tls_config.get('verify', True)
+        )
+
+    return docker.DockerClient(base_url=host_config.get('url'), tls=tls, timeout=host_config.get('timeout', 30))
+
+# Same selection as Hubble.get_container, optionally narrowed to one container name
+def find_container(client, mode, container_name=None):
+    if container_name:
+        return client.containers.get(container_name)
+
+    match = None
+    for container in client.containers.list(all=True):
+        if container.image.tags and IMAGES.get(mode, '') in container.image.tags[0]:
+            match = container
+    return match
+
+def describe_container(container, mode):
+    networks = container.attrs.get('NetworkSettings', {}).get('Networks') or {}
+    network = next(reversed(networks.values()), {}) if networks else {}
+
+    docker_data = {
+        'Container ID': container.id,
+        'Image Version': container.image.labels.get('org.opencontainers.image.version'),
+        'Container Status': container.status,
+        'Container Started At': container.attrs.get('State', {}).get('StartedAt'),
+        'Container IP': network.get('IPAddress')
+    }
+
+    if mode == 'Farmer':
+        for value in container.attrs.get('Args') or []:
+            if 'ws://' in value:
+                ip_address = re.search(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', value)
+                if ip_address:
+                    docker_data['Node IP'] = ip_address.group()
+
+    return docker_data
+
+
+class DockerHost:
+    # One client per endpoint, shared by the log streams of its containers
+    def __init__(self, host_config, client_factory=None) -> None:
+        self.name = host_config.get('name') or host_config.get('url')
+        self.config = host_config
+        self.client_factory = client_factory or create_docker_client
+
+        self.client = None
+        self.lock = threading.Lock()
+        self.failures = 0
+
+    def get_client(self):
+        with self.lock:
+            if self.client is None:
+                self.client = self.client_factory(self.config)
+                logger.info(f'Connected to docker host {self.name}')
+            return self.client
+
+    # A failed stream drops the client so the next attempt reconnects
+    def reset(self) -> float:
+        with self.lock:
+            if self.client is not None and hasattr(self.client, 'close'):
+                try:
+                    self.client.close()
+                except Exception:
+                    pass
+            self.client = None
+            self.failures += 1
+            return min(60, 2 ** min(self.failures, 6))
+
+    def healthy(self) -> None:
+        with self.lock:
+            self.failures = 0
+
+
+class ContainerTarget:
+    def __init__(self, host, target_config) -> None:
+        self.host = host
+        self.name = target_config.get('name')
+        self.mode = target_config.get('mode')
+        self.container_name = target_config.get('container')
+
+        self.docker_data = None
+        self.registered = False
+
+        # Daemon time of the last line seen in nanoseconds, the remote clock may differ from ours
+        self.last_log_time = None
+
+
+class DockerHostSupervisor:
+    def __init__(self, hosts_config, handle_event, register, client_factory=None, retry_delay=30) -> None:
+        self.handle_event = handle_event
+        self.register = register
+
+        # Per-target problems are retried after a fixed delay without touching the host client
+        self.retry_delay = retry_delay
+        self.hosts = []
+        self.targets = []
+
+        for host_config in hosts_config:
+            host = DockerHost(host_config, client_factory)
+            self.hosts.append(host)
+            for target_config in host_config.get('containers') or []:
+                self.targets.append(ContainerTarget(host, target_config))
+
+        self.threads = []
+        self.running = False
+
+    def start(self) -> None:
+        self.running = True
+        for target in self.targets:
+            thread = threading.Thread(target=self._target_loop, args=(target,), name=f'docker-{target.host.name}-{target.name}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f'Monitoring {len(self.targets)} container(s) on {len(self.hosts)} docker host(s)')
+
+    def stop(self) -> None:
+        self.running = False
+
+    def serve_forever(self) -> None:
+        self.start()
+        while self.running:
+            time.sleep(1)
+
+    def _target_loop(self, target) -> None:
+        while self.running:
+            try:
+                self.stream(target)
+                target.host.healthy()
+                time.sleep(1)
+
+            except Exception as e:
+                if is_missing_container(e):
+                    logger.warning(f'{target.name} on {target.host.name}: {e}. Retrying in {self.retry_delay}s')
+                    time.sleep(self.retry_delay)
+
+                elif is_host_error(e):
+                    delay = target.host.reset()
+                    logger.error(f'Lost docker host {target.host.name} for {target.name}: {e}. Reconnecting in {delay}s')
+                    time.sleep(delay)
+
+                else:
+                    logger.error(f'Error streaming {target.name} on {target.host.name}: {e}. Retrying in {self.retry_delay}s')
+                    time.sleep(self.retry_delay)
+
+    def stream(self, target) -> None:
+        client = target.host.get_client()
+        container = find_container(client, target.mode, target.container_name)
+        if container is None:
+            raise ContainerMissing(f'no {target.mode} container found')
+
+        container.reload()
+        target.docker_data = describe_container(container, target.mode)
+        if not target.registered:
+            self.register(target)
+            target.registered = True
+
+        if container.status != 'running':
+            logger.warning(f'{target.name} on {target.host.name} has a status of {container.status}')
+            time.sleep(10)
+            return
+
+        target.host.healthy()
+        if target.last_log_time:
+            logs = container.logs(stdout=True, stderr=True, stream=True, timestamps=True, since=target.last_log_time / 1e9)
+        else:
+            logs = container.logs(stdout=True, stderr=True, stream=True, timestamps=True)
+
+        for log in logs:
+            if not self.running:
+                return
+
+            # Reconnects ask for lines from the last daemon time seen, `since` is inclusive and
+            # less precise than the log timestamps, so lines already handled are skipped here
+            log_time, log = split_docker_timestamp(log)
+            if log_time is not None:
+                if target.last_log_time is not None and log_time <= target.last_log_time:
+                    continue
+                target.last_log_time = log_time
+
+            if log.startswith(constants.BROKEN_STREAM_LOG):
+                logger.error(f'Log stream of {target.name} on {target.host.name} is broken until the container is redeployed')
+
+            try:
+                event = LogParser.parse_raw_line(target.name, target.mode, log)
+                if event:
+                    event['Docker Host'] = target.host.name
+                    self.handle_event(event)
+            except Exception as e:
+                logger.error(f'Error evaluating log of {target.name}:', exc_info=e)
@@ -0,0 +1,240 @@
+import queue
+import threading
+import time
+
+from src.logger import logger
+
+class Sink:
+    name = 'sink'
+
+    def __init__(self, options=None) -> None:
+        options = options or {}
+        self.batch_size = options.get('batch_size', 1)
+        self.batch_wait = options.get('batch_wait', 0.0)
+
+        # While catching up on a backlog, batches are filled as far as possible without waiting
+        self.catch_up_batch_size = options.get('catch_up_batch_size', max(self.batch_size, 500))
+        self.catch_up = False
+
+        # 'block' applies backpressure to the log stream, 'drop' discards new events when the queue is full
+        self.full_policy = options.get('full_policy', 'drop')
+        self.queue = queue.Queue(maxsize=options.get('queue_size', 10000))
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.stats_lock = threading.Lock()
+
+        # Every offered item is numbered, settled is the highest number up to which all items
+        # were delivered, failed or dropped, whatever order they finished in
+        self.settled = 0
+        self.settled_ahead = set()
+
+        self.thread = None
+        self.running = False
+
+    def start(self) -> None:
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f'sink-{self.name}', daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5) -> None:
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout)
+        self.close()
+
+    def offer(self, event) -> None:
+        with self.stats_lock:
+            self.published += 1
+            item = (time.monotonic(), event, self.published)
+
+        try:
+            if self.full_policy == 'block':
+                self.queue.put(item)
+            else:
+                self.queue.put_nowait(item)
+        except queue.Full:
+            with self.stats_lock:
+                self.dropped += 1
+                self._settle([item])
+
+    def _next_batch(self):
+        try:
+            batch = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        batch_size = self.catch_up_batch_size if self.catch_up else self.batch_size
+        batch_wait = 0.0 if self.catch_up else self.batch_wait
+
+        deadline = time.monotonic() + batch_wait
+        while len(batch) < batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        while self.running or not self.queue.empty():
+            batch = self._next_batch()
+            self.tick()
+            if not batch:
+                continue
+
+            # A failing sink only loses its own batch, other sinks keep running
+            try:
+                self.write_items(batch)
+            except Exception as e:
+                self.record(batch, failed=True)
+                logger.error(f'Error in {self.name} sink:', exc_info=e)
+
+    # Sinks that hand events off to their own workers override this and record each delivery themselves
+    def write_items(self, batch) -> None:
+        self.write_batch([item[1] for item in batch])
+        self.record(batch)
+
+    # Count (queued at, event, number) items as delivered or failed, lag is measured from when they were queued
+    def record(self, batch, failed=False) -> None:
+        now = time.monotonic()
+        with self.stats_lock:
+            if failed:
+                self.failed += len(batch)
+            else:
+                self.delivered += len(batch)
+            self.lag = now - batch[-1][0]
+            self.max_lag = max(self.max_lag, now - batch[0][0])
+            self._settle(batch)
+
+    def _settle(self, batch) -> None:
+        for item in batch:
+            self.settled_ahead.add(item[2])
+        while self.settled + 1 in self.settled_ahead:
+            self.settled += 1
+            self.settled_ahead.discard(self.settled)
+
+    # Events that did not reach their destination, callers compare it before and after settling
+    def losses(self) -> int:
+        with self.stats_lock:
+            return self.failed + self.dropped
+
+    def set_catch_up(self, catch_up) -> None:
+        self.catch_up = catch_up
+
+    # Called from the worker thread at least every half second, for sinks with timed work
+    def tick(self) -> None:
+        pass
+
+    # Apply top-level config changes in place, sink options changes rebuild the sink instead
+    def reconfigure(self, config, rate_limiter) -> None:
+        pass
+
+    def write_batch(self, events) -> None:
+        for event in events:
+            self.write(event)
+
+    def write(self, event) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def metrics(self):
+        return {
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'queued': self.queue.qsize(),
+            'lag': self.lag,
+            'max_lag': self.max_lag
+        }
+
+
+class EventBus:
+    def __init__(self, report_interval=60) -> None:
+        self.sinks = []
+        self.report_interval = report_interval
+        self.last_report = time.monotonic()
+        self.last_delivered = {}
+        self.catch_up = False
+
+    def add_sink(self, sink) -> None:
+        self.sinks.append(sink)
+
+    def start(self) -> None:
+        for sink in self.sinks:
+            sink.start()
+            logger.info(f'Started {sink.name} sink')
+
+    def stop(self) -> None:
+        for sink in self.sinks:
+            sink.stop()
+
+    # New sinks are started before the list is swapped so no event is published into a stopped sink,
+    # the old sinks then drain what they already queued, sinks kept from the old list keep running
+    def replace_sinks(self, sinks) -> None:
+        for sink in sinks:
+            if sink in self.sinks:
+                continue
+            sink.set_catch_up(self.catch_up)
+            sink.start()
+            logger.info(f'Started {sink.name} sink')
+
+        old_sinks, self.sinks = self.sinks, list(sinks)
+        self.last_delivered = {sink.name: self.last_delivered[sink.name] for sink in sinks if sink in old_sinks and sink.name in self.last_delivered}
+
+        for sink in old_sinks:
+            if sink in sinks:
+                continue
+            sink.stop()
+            logger.info(f'Stopped {sink.name} sink')
+
+    # Each event is published once and fanned out to every sink queue
+    def publish(self, event) -> None:
+        for sink in self.sinks:
+            sink.offer(event)
+
+        self.report()
+
+    def set_catch_up(self, catch_up) -> None:
+        self.catch_up = catch_up
+        for sink in self.sinks:
+            sink.set_catch_up(catch_up)
+
+    def metrics(self):
+        return {sink.name: sink.metrics() for sink in self.sinks}
+
+    # Position of every sink right now, settled() tells when all of them got past it
+    def mark(self):
+        return [(sink, sink.published) for sink in self.sinks]
+
+    def settled(self, mark) -> bool:
+        return all(sink.settled >= published for sink, published in mark)
+
+    def losses(self) -> int:
+        return sum(sink.losses() for sink in self.sinks)
+
+    def report(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.last_report
+        if elapsed < self.report_interval:
+            return
+
+        self.last_report = now
+        for name, metrics in self.metrics().items():
+            rate = (metrics['delivered'] - self.last_delivered.get(name, 0)) / elapsed
+            self.last_delivered[name] = metrics['delivered']
+            logger.info(f"Sink {name}: {rate:.1f} events/s, {metrics['queued']} queued, {metrics['dropped']} dropped, {metrics['failed']} failed, lag {metrics['lag']:.2f}s (max {metrics['max_lag']:.2f}s)")
+
+            for url, status in (metrics.get('breakers') or {}).items():
+                logger.info(f"Sink {name}: circuit for {url} {status['state']}, {status['failures']} consecutive failures, {len(status['transitions'])} recent transitions")
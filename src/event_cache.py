@@ -0,0 +1,239 @@
+import hashlib
+import json
+import math
+import os
+import struct
+import threading
+import time
+
+from collections import OrderedDict
+from src.logger import logger
+
+# Fields that identify an event beyond its name, type and timestamp
+KEY_FIELDS = {
+    'Plotting Sector': ('Farm Index', 'Plot Current Sector'),
+    'Replotting Sector': ('Farm Index', 'Plot Current Sector'),
+    'Reward': ('Farm Index', 'Reward Hash'),
+    'Failed to Send Solution': ('Farm Index',),
+    'Vote': ('Slot',),
+    'Block': ('Slot',)
+}
+
+# Header of the persisted filter, files from older versions are ignored
+BLOOM_MAGIC = b'HBLOOM2'
+
+def event_fingerprint(event) -> bytes:
+    name = event.get('Farmer Name') or event.get('Node Name')
+    data = event.get('Data') or {}
+    fields = KEY_FIELDS.get(event.get('Event Type'))
+
+    if fields:
+        key = [name, event.get('Event Type'), event.get('Datetime')] + [data.get(field) for field in fields]
+    else:
+        key = [name, event.get('Event Type'), event.get('Datetime'), data]
+
+    # 16 byte digest keeps each entry small regardless of payload size
+    return hashlib.blake2b(json.dumps(key, sort_keys=True, default=str).encode('utf-8'), digest_size=16).digest()
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001) -> None:
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+        self.capacity = capacity
+        self.count = 0
+        self.started = time.time()
+
+    def _positions(self, fingerprint):
+        # Double hashing over the two halves of the fingerprint
+        first = int.from_bytes(fingerprint[:8], 'little')
+        second = int.from_bytes(fingerprint[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, fingerprint) -> None:
+        for position in self._positions(fingerprint):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, fingerprint) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(fingerprint))
+
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    def write(self, file) -> None:
+        file.write(self.size.to_bytes(8, 'little'))
+        file.write(self.hashes.to_bytes(4, 'little'))
+        file.write(self.count.to_bytes(8, 'little'))
+        file.write(struct.pack('<d', self.started))
+        file.write(self.bits)
+
+    def read(self, file) -> bool:
+        size = int.from_bytes(file.read(8), 'little')
+        hashes = int.from_bytes(file.read(4), 'little')
+        count = int.from_bytes(file.read(8), 'little')
+        started, = struct.unpack('<d', file.read(8))
+        bits = bytearray(file.read(len(self.bits)))
+
+        # A filter saved with a different capacity cannot be reused
+        if size != self.size or hashes != self.hashes or len(bits) != len(self.bits):
+            return False
+
+        self.bits = bits
+        self.count = count
+        self.started = started
+        return True
+
+
+class GenerationalBloomFilter:
+    # Two generations, the older one is dropped every horizon or once the current one is full,
+    # so the false positive rate stays bounded and fingerprints live between one and two horizons
+    def __init__(self, capacity, horizon, error_rate=0.001) -> None:
+        self.capacity = capacity
+        self.horizon = horizon
+        self.error_rate = error_rate
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = None
+
+    def rotate(self) -> None:
+        self.previous = self.current
+        self.current = BloomFilter(self.capacity, self.error_rate)
+
+    def _maybe_rotate(self) -> None:
+        if self.current.full() or time.time() - self.current.started >= self.horizon:
+            self.rotate()
+
+            # A filter older than two horizons, e.g. after a long downtime, holds nothing useful
+            if time.time() - self.previous.started >= 2 * self.horizon:
+                self.previous = None
+
+    def add(self, fingerprint) -> None:
+        self._maybe_rotate()
+        self.current.add(fingerprint)
+
+    def __contains__(self, fingerprint) -> bool:
+        self._maybe_rotate()
+        return fingerprint in self.current or (self.previous is not None and fingerprint in self.previous)
+
+    def save(self, path) -> None:
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(BLOOM_MAGIC)
+            file.write(bytes([2 if self.previous is not None else 1]))
+            self.current.write(file)
+            if self.previous is not None:
+                self.previous.write(file)
+        os.replace(temp_path, path)
+
+    def load(self, path) -> bool:
+        with open(path, 'rb') as file:
+            if file.read(len(BLOOM_MAGIC)) != BLOOM_MAGIC:
+                return False
+            generations = file.read(1)[0]
+
+            current = BloomFilter(self.capacity, self.error_rate)
+            if not current.read(file):
+                return False
+
+            previous = None
+            if generations > 1:
+                previous = BloomFilter(self.capacity, self.error_rate)
+                if not previous.read(file):
+                    previous = None
+
+        self.current, self.previous = current, previous
+        self._maybe_rotate()
+        return True
+
+
+class EventCache:
+    def __init__(self, max_entries=100000, horizon=86400, bloom_path=None, bloom_capacity=1000000, bloom_horizon=7 * 86400) -> None:
+        self.max_entries = max_entries
+        self.horizon = horizon
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.report_interval = 300
+        self.last_report = time.monotonic()
+
+        # Optional persisted Bloom filter so duplicates are still caught after a restart
+        self.bloom = None
+        self.bloom_path = bloom_path
+        if bloom_path:
+            self.bloom = GenerationalBloomFilter(bloom_capacity, bloom_horizon)
+            if os.path.exists(bloom_path):
+                try:
+                    if self.bloom.load(bloom_path):
+                        logger.info(f'Loaded event fingerprints from {bloom_path}')
+                    else:
+                        logger.warning(f'Ignoring {bloom_path}, it was saved with a different capacity or format')
+                except Exception as e:
+                    logger.warning(f'Unable to load event fingerprints from {bloom_path}: {e}')
+
+    def seen(self, event) -> bool:
+        fingerprint = event_fingerprint(event)
+        now = time.monotonic()
+
+        with self.lock:
+            added = self.entries.get(fingerprint)
+            if added is not None and now - added <= self.horizon:
+                self.entries.move_to_end(fingerprint)
+                self.hits += 1
+                return True
+
+            if added is None and self.bloom is not None and fingerprint in self.bloom:
+                self.hits += 1
+                return True
+
+            self.misses += 1
+            return False
+
+    # Log hit rates and persist the Bloom filter periodically
+    def report(self) -> None:
+        now = time.monotonic()
+        if now - self.last_report < self.report_interval:
+            return
+
+        self.last_report = now
+        stats = self.stats()
+        logger.info(f"Duplicate cache: {stats['hits']:,} hits, {stats['misses']:,} misses ({stats['hit_rate']:.1%} hit rate), {stats['entries']:,} entries")
+        self.save()
+
+    def add(self, event) -> None:
+        fingerprint = event_fingerprint(event)
+
+        with self.lock:
+            self.entries[fingerprint] = time.monotonic()
+            self.entries.move_to_end(fingerprint)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+            if self.bloom is not None:
+                self.bloom.add(fingerprint)
+
+    def save(self) -> None:
+        if self.bloom is None:
+            return
+
+        try:
+            with self.lock:
+                self.bloom.save(self.bloom_path)
+            logger.info(f'Saved event fingerprints to {self.bloom_path}')
+        except Exception as e:
+            logger.warning(f'Unable to save event fingerprints to {self.bloom_path}: {e}')
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
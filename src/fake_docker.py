@@ -0,0 +1,163 @@
+import datetime
+import random
+import threading
+import time
+
+import src.constants as constants
+
+class FakeLogSource:
+    def __init__(self, mode, rate=1000, duration=60, burst_size=0, burst_interval=10, event_ratio=0.5, farms=8) -> None:
+        self.mode = mode
+        self.rate = rate
+        self.duration = duration
+        self.burst_size = burst_size
+        self.burst_interval = burst_interval
+        self.event_ratio = event_ratio
+        self.farms = farms
+
+        self.lines = 0
+        self.events = 0
+        self.finished = threading.Event()
+        self.best = 1000000
+        self.sector = 0
+
+    def _timestamp(self):
+        return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+    def _farmer_event(self, timestamp):
+        farm_index = random.randrange(self.farms)
+        roll = random.random()
+
+        if roll < 0.9:
+            self.sector += 1
+            return f'{timestamp}  INFO single_disk_farm{{farm_index={farm_index}}}: subspace_farmer::single_disk_farm::plotting: Plotting sector ({random.uniform(0, 100):.2f}% complete) sector_index={self.sector}'
+        elif roll < 0.98:
+            return f'{timestamp}  INFO single_disk_farm{{farm_index={farm_index}}}: subspace_farmer::reward_signing: Successfully signed reward hash 0x{random.getrandbits(256):064x}'
+
+        return f'{timestamp}  WARN single_disk_farm{{farm_index={farm_index}}}: subspace_farmer::single_disk_farm::farming: Failed to send solution error=Timeout'
+
+    def _node_event(self, timestamp):
+        if random.random() < 0.8:
+            self.best += 1
+            return f'{timestamp}  INFO Consensus: substrate: 💤 Idle ({random.randint(20, 60)} peers), best: #{self.best} (0x{random.getrandbits(64):016x}), finalized #{self.best - 100} (0x{random.getrandbits(64):016x}), ⬇ {random.uniform(1, 900):.1f}kiB/s ⬆ {random.uniform(1, 900):.1f}kiB/s'
+
+        return f'{timestamp}  INFO Consensus: subspace_service: Claimed vote slot={random.getrandbits(32)}'
+
+    def _noise(self, timestamp):
+        return f'{timestamp}  INFO subspace_networking::node_runner: Peer connected peer_id=12D3KooW{random.getrandbits(128):032x}'
+
+    def line(self) -> bytes:
+        timestamp = self._timestamp()
+        self.lines += 1
+
+        if random.random() < self.event_ratio:
+            self.events += 1
+            if self.mode == 'Farmer':
+                line = self._farmer_event(timestamp)
+            else:
+                line = self._node_event(timestamp)
+        else:
+            line = self._noise(timestamp)
+
+        return (line + '\n').encode('utf-8')
+
+    # Emit lines at the configured rate with optional bursts on top
+    def stream(self):
+        started = time.monotonic()
+        next_burst = started + self.burst_interval
+        sent = 0
+
+        while True:
+            now = time.monotonic()
+            if now - started >= self.duration:
+                break
+
+            if self.burst_size and now >= next_burst:
+                for _ in range(self.burst_size):
+                    yield self.line()
+                next_burst += self.burst_interval
+
+            due = int((now - started) * self.rate)
+            while sent < due:
+                yield self.line()
+                sent += 1
+
+            time.sleep(0.001)
+
+        self.finished.set()
+
+
+class FakeImage:
+    def __init__(self, mode) -> None:
+        repository = 'subspace/farmer' if mode == 'Farmer' else 'subspace/node'
+        version = constants.VERSIONS['Farmer Version'] if mode == 'Farmer' else constants.VERSIONS['Node Version']
+        self.tags = [f'ghcr.io/{repository}:{version}']
+        self.labels = {'org.opencontainers.image.version': version}
+
+
+class FakeContainer:
+    def __init__(self, mode, source) -> None:
+        self.id = f'fake-{mode.lower()}'
+        self.image = FakeImage(mode)
+        self.status = 'running'
+        self.source = source
+        self.attrs = {
+            'NetworkSettings': {'Networks': {'bridge': {'IPAddress': '172.17.0.2'}}},
+            'State': {'StartedAt': datetime.datetime.now(datetime.timezone.utc).isoformat()},
+            'Args': ['farm', '--node-rpc-url', 'ws://172.17.0.3:9944'],
+            'Mounts': []
+        }
+
+    def reload(self) -> None:
+        if self.source.finished.is_set():
+            self.status = 'exited'
+
+    def logs(self, stdout=True, stderr=True, stream=False, timestamps=False, **kwargs):
+        if timestamps:
+            return self._timestamped(self.source.stream())
+        return self.source.stream()
+
+    # Prefix lines the way the daemon does for timestamps=True
+    @staticmethod
+    def _timestamped(lines):
+        for line in lines:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            yield now.strftime('%Y-%m-%dT%H:%M:%S.%f000Z ').encode('ascii') + line
+
+    # Samples shaped like the docker stats API, one per second with growing counters
+    def stats(self, stream=True, decode=True):
+        cpu_usage = system_usage = rx = tx = read = write = 0
+
+        while not self.source.finished.is_set():
+            cpu_usage += int(random.uniform(0.5, 2.0) * 1e9)
+            system_usage += int(4e9)
+            rx += random.randint(0, 1 << 20)
+            tx += random.randint(0, 1 << 20)
+            read += random.randint(0, 8 << 20)
+            write += random.randint(0, 8 << 20)
+
+            yield {
+                'read': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'cpu_stats': {'cpu_usage': {'total_usage': cpu_usage}, 'system_cpu_usage': system_usage, 'online_cpus': 4},
+                'memory_stats': {'usage': random.randint(2 << 30, 3 << 30), 'limit': 16 << 30, 'stats': {'inactive_file': 256 << 20}},
+                'networks': {'eth0': {'rx_bytes': rx, 'tx_bytes': tx}},
+                'blkio_stats': {'io_service_bytes_recursive': [{'op': 'read', 'value': read}, {'op': 'write', 'value': write}]}
+            }
+            time.sleep(1)
+
+
+class FakeContainers:
+    def __init__(self, container) -> None:
+        self.container = container
+
+    def list(self, all=False):
+        return [self.container]
+
+    def get(self, container_id):
+        return self.container
+
+
+# Stands in for docker.DockerClient with a single generated container
+class FakeDockerClient:
+    def __init__(self, mode, source) -> None:
+        self.containers = FakeContainers(FakeContainer(mode, source))
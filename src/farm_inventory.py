@@ -0,0 +1,111 @@
+import datetime
+import threading
+import time
+
+from src.logger import logger
+
+# Startup events that describe a farm, each one fills a single field of the farm record
+INVENTORY_EVENTS = ['Farm ID', 'Farm Public Key', 'Farm Allocated Space', 'Farm Directory']
+
+# Fields from later status events that are kept on the farm record
+STATUS_FIELDS = ['Farm Status', 'Plot Percentage', 'Plot Type']
+
+class FarmInventory:
+    def __init__(self, farmer_name, publish, flush_delay=10) -> None:
+        self.farmer_name = farmer_name
+        self.publish = publish
+        self.flush_delay = flush_delay
+
+        self.farms = {}
+        self.pending = False
+        self.last_update = 0.0
+        self.lock = threading.Lock()
+        self.running = False
+
+    def start(self) -> None:
+        self.running = True
+        threading.Thread(target=self._timer_loop, name='farm-inventory', daemon=True).start()
+
+    def stop(self) -> None:
+        self.running = False
+
+    # Returns True when the event was folded into the inventory instead of being sent on its own
+    def absorb(self, event) -> bool:
+        event_type = event.get('Event Type')
+        data = event.get('Data') or {}
+
+        if event_type in INVENTORY_EVENTS:
+            with self.lock:
+                record = self.farms.setdefault(data.get('Farm Index'), {'Farm Index': data.get('Farm Index')})
+                record[event_type] = data.get(event_type)
+                if data.get('Farm Status'):
+                    record['Farm Status'] = data.get('Farm Status')
+
+                self.pending = True
+                self.last_update = time.monotonic()
+
+            return True
+
+        # Any other farmer event after a complete inventory means the startup sequence is over
+        if self.pending and self.complete():
+            self.flush()
+
+        self.attach(event)
+        return False
+
+    def complete(self) -> bool:
+        with self.lock:
+            return all(all(field in record for field in INVENTORY_EVENTS) for record in self.farms.values())
+
+    # Add the farm identity to status events and keep the latest status on the record
+    def attach(self, event) -> None:
+        data = event.get('Data')
+        if not data or data.get('Farm Index') is None:
+            return
+
+        with self.lock:
+            record = self.farms.get(int(data.get('Farm Index')))
+            if record is None:
+                return
+
+            if record.get('Farm ID'):
+                data['Farm ID'] = record['Farm ID']
+
+            for field in STATUS_FIELDS:
+                if field in data:
+                    record[field] = data[field]
+
+    def get(self, farm_index):
+        with self.lock:
+            record = self.farms.get(farm_index)
+            return dict(record) if record else None
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.pending:
+                return
+
+            self.pending = False
+            farms = [dict(record) for _, record in sorted(self.farms.items())]
+
+        logger.info(f'Registering inventory of {len(farms)} farm(s) for {self.farmer_name}')
+        self.publish({
+            'Event Type': 'Farm Inventory',
+            'Level': 'INFO',
+            'Age': 0,
+            'Datetime': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S.%f'),
+            'Farmer Name': self.farmer_name,
+            'Data': {
+                'Farms': farms
+            }
+        })
+
+    # Flush an incomplete inventory once no new farm lines arrived for flush_delay seconds
+    def _timer_loop(self) -> None:
+        while self.running:
+            time.sleep(1)
+            try:
+                if self.pending and time.monotonic() - self.last_update >= self.flush_delay:
+                    self.flush()
+            except Exception as e:
+                logger.error('Error flushing farm inventory:', exc_info=e)
@@ -0,0 +1,219 @@
+import collections
+import json
+import os
+import socket
+import threading
+
+from src.aggregator import FRAME_EVENT, encode_frame
+from src.event_bus import Sink
+from src.logger import logger
+from src.serializer import dumps
+
+class Subscriber:
+    # Bounded buffer drained by its own writer thread, a slow reader never blocks the feed
+    def __init__(self, sock, subscription, buffer_size=1000, drop_policy='drop_oldest') -> None:
+        self.sock = sock
+        self.format = subscription.get('format', 'json')
+        self.types = set(subscription.get('types') or [])
+        self.names = set(subscription.get('names') or [])
+        self.farm_indexes = {int(index) for index in subscription.get('farm_index') or []}
+
+        self.buffer = collections.deque()
+        self.buffer_size = buffer_size
+        self.drop_policy = drop_policy
+        self.condition = threading.Condition()
+
+        self.sent = 0
+        self.dropped = 0
+        self.connected = True
+
+    def matches(self, event) -> bool:
+        if self.types and event.get('Event Type') not in self.types:
+            return False
+        if self.names and (event.get('Farmer Name') or event.get('Node Name')) not in self.names:
+            return False
+        if self.farm_indexes:
+            farm_index = (event.get('Data') or {}).get('Farm Index')
+            if farm_index is None or int(farm_index) not in self.farm_indexes:
+                return False
+        return True
+
+    def offer(self, payload) -> None:
+        with self.condition:
+            if len(self.buffer) >= self.buffer_size:
+                self.dropped += 1
+                if self.drop_policy == 'disconnect':
+                    self.connected = False
+                    self.condition.notify()
+                    return
+                if self.drop_policy == 'drop_newest':
+                    return
+                self.buffer.popleft()
+
+            self.buffer.append(payload)
+            self.condition.notify()
+
+    def run(self) -> None:
+        try:
+            while True:
+                with self.condition:
+                    while self.connected and not self.buffer:
+                        self.condition.wait()
+                    if not self.connected:
+                        break
+                    payloads = list(self.buffer)
+                    self.buffer.clear()
+
+                self.sock.sendall(b''.join(payloads))
+                self.sent += len(payloads)
+
+        except OSError:
+            pass
+
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        with self.condition:
+            self.connected = False
+            self.condition.notify()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class FeedSink(Sink):
+    name = 'feed'
+
+    # (device, inode) of the sockets bound by feed sinks of this process
+    bound_sockets = set()
+
+    def __init__(self, options=None) -> None:
+        options = dict(options or {})
+        options.setdefault('batch_size', 100)
+        super().__init__(options)
+
+        self.path = options.get('path', './hubble.sock')
+        self.buffer_size = options.get('subscriber_buffer', 1000)
+        self.drop_policy = options.get('drop_policy', 'drop_oldest')
+
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.sequence = 0
+        self.server = None
+        self.bound = None
+
+    # A stale socket file or one of a sink being replaced in this process is taken over,
+    # a socket another process still answers on is left alone
+    def start(self) -> None:
+        if os.path.exists(self.path):
+            stat = os.stat(self.path)
+            if (stat.st_dev, stat.st_ino) not in FeedSink.bound_sockets and self.answers():
+                raise RuntimeError(f'Another process is listening on {self.path}, not starting the feed')
+            os.unlink(self.path)
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        self.server.listen(16)
+
+        # A replacement sink binds the same path before this one is closed, only our own file is removed
+        stat = os.stat(self.path)
+        self.bound = (stat.st_dev, stat.st_ino)
+        FeedSink.bound_sockets.add(self.bound)
+
+        super().start()
+        threading.Thread(target=self._accept_loop, name='feed-accept', daemon=True).start()
+        logger.info(f'Publishing events on {self.path}')
+
+    def answers(self) -> bool:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        probe.settimeout(1)
+        try:
+            probe.connect(self.path)
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+
+    def _accept_loop(self) -> None:
+        while self.running:
+            try:
+                sock, _ = self.server.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._subscribe, args=(sock,), name='feed-subscribe', daemon=True).start()
+
+    # Clients send one JSON line with their subscription, an empty line subscribes to everything
+    def _subscribe(self, sock) -> None:
+        try:
+            sock.settimeout(5)
+            line = sock.makefile('rb').readline(64 * 1024)
+            sock.settimeout(None)
+            subscription = json.loads(line) if line.strip() else {}
+        except (OSError, ValueError) as e:
+            logger.warning(f'Rejected feed subscriber: {e}')
+            sock.close()
+            return
+
+        subscriber = Subscriber(sock, subscription, self.buffer_size, self.drop_policy)
+        with self.lock:
+            self.subscribers.append(subscriber)
+        logger.info(f'Feed subscriber connected ({len(self.subscribers)} total)')
+
+        subscriber.run()
+
+        with self.lock:
+            self.subscribers.remove(subscriber)
+        logger.info(f'Feed subscriber disconnected after {subscriber.sent} events, {subscriber.dropped} dropped')
+
+    # Each event is serialized once per format no matter how many subscribers want it
+    def write_batch(self, events) -> None:
+        with self.lock:
+            subscribers = list(self.subscribers)
+        if not subscribers:
+            return
+
+        for event in events:
+            self.sequence += 1
+            body = None
+            encoded = {}
+
+            for subscriber in subscribers:
+                if not subscriber.connected or not subscriber.matches(event):
+                    continue
+
+                payload = encoded.get(subscriber.format)
+                if payload is None:
+                    body = body or dumps(event)
+                    if subscriber.format == 'binary':
+                        payload = encode_frame(FRAME_EVENT, self.sequence, body)
+                    else:
+                        payload = body + b'\n'
+                    encoded[subscriber.format] = payload
+
+                subscriber.offer(payload)
+
+    def close(self) -> None:
+        if self.server:
+            self.server.close()
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.close()
+
+        FeedSink.bound_sockets.discard(self.bound)
+        try:
+            stat = os.stat(self.path)
+            if (stat.st_dev, stat.st_ino) == self.bound:
+                os.unlink(self.path)
+        except OSError:
+            pass
+
+    def metrics(self):
+        metrics = super().metrics()
+        with self.lock:
+            metrics['subscribers'] = len(self.subscribers)
+            metrics['subscriber_dropped'] = sum(subscriber.dropped for subscriber in self.subscribers)
+        return metrics
@@ -0,0 +1,281 @@
+import threading
+import time
+
+from src.logger import logger
+from src.helpers import Helpers
+
+class SlidingWindowCounter:
+    def __init__(self, window, buckets=60):
+        # window length in seconds split into fixed width buckets
+        self.window = window
+        self.bucket_width = window / buckets
+        self.counts = [0] * buckets
+        self.current = None
+        self.total = 0
+
+    def _advance(self, now) -> None:
+        bucket = int(now // self.bucket_width)
+
+        if self.current is None:
+            self.current = bucket
+            return
+
+        steps = bucket - self.current
+        if steps <= 0:
+            return
+
+        # Whole window has expired, no need to walk each bucket
+        if steps >= len(self.counts):
+            self.counts = [0] * len(self.counts)
+            self.total = 0
+        else:
+            for step in range(1, steps + 1):
+                index = (self.current + step) % len(self.counts)
+                self.total -= self.counts[index]
+                self.counts[index] = 0
+
+        self.current = bucket
+
+    def add(self, now, amount=1) -> int:
+        self._advance(now)
+        self.counts[self.current % len(self.counts)] += amount
+        self.total += amount
+        return self.total
+
+    def count(self, now) -> int:
+        self._advance(now)
+        return self.total
+
+
+class TimerWheel:
+    def __init__(self, slots=512, resolution=1.0):
+        self.slots = [[] for _ in range(slots)]
+        self.resolution = resolution
+        self.position = 0
+        self.last_tick = time.monotonic()
+
+        # Only the latest deadline per key is live, older wheel entries are ignored when they fire
+        self.deadlines = {}
+
+    def schedule(self, key, delay, callback) -> None:
+        ticks = max(1, int(delay / self.resolution))
+        # The target slot is first reached after `ticks % slots` ticks, each further pass costs a full turn
+        rounds = (ticks - 1) // len(self.slots)
+        deadline = (self.position + ticks, callback)
+
+        self.deadlines[key] = deadline
+        self.slots[(self.position + ticks) % len(self.slots)].append([rounds, key, deadline])
+
+    def cancel(self, key) -> None:
+        self.deadlines.pop(key, None)
+
+    def advance(self, now=None) -> list:
+        now = time.monotonic() if now is None else now
+        fired = []
+
+        while now - self.last_tick >= self.resolution:
+            self.last_tick += self.resolution
+            self.position += 1
+
+            slot = self.slots[self.position % len(self.slots)]
+            remaining = []
+
+            for entry in slot:
+                rounds, key, deadline = entry
+                if self.deadlines.get(key) is not deadline:
+                    continue
+
+                if rounds > 0:
+                    entry[0] -= 1
+                    remaining.append(entry)
+                else:
+                    del self.deadlines[key]
+                    fired.append((key, deadline[1]))
+
+            self.slots[self.position % len(self.slots)] = remaining
+
+        return fired
+
+
+class HealthMonitor:
+    def __init__(self, config, rate_limiter) -> None:
+        self.config = config
+        self.rate_limiter = rate_limiter
+        self.lock = threading.Lock()
+        self.wheel = TimerWheel()
+
+        self.configure(config)
+
+        self.failed_solutions = {}
+        self.best_blocks = {}
+        self.active_alerts = set()
+        self.pending_alerts = []
+        self.running = False
+
+    # Thresholds can be replaced at runtime, detector state is kept
+    def configure(self, config) -> None:
+        health = config.get('health') or {}
+        with self.lock:
+            self.config = config
+            self.reward_absence = self._seconds(health.get('reward_absence_hours'), 3600)
+            self.max_failed_solutions = health.get('max_failed_solutions_per_hour')
+            self.best_stall = self._seconds(health.get('best_block_stall_minutes'), 60)
+            self.max_finalized_lag = health.get('max_finalized_lag')
+            self.min_peers = health.get('min_peers')
+
+            # Historical events replayed from the log are not evaluated
+            self.max_event_age = health.get('max_event_age_minutes', 5)
+
+    @staticmethod
+    def _seconds(value, multiplier):
+        if value is None:
+            return None
+        return float(value) * multiplier
+
+    def start(self) -> None:
+        self.running = True
+        thread = threading.Thread(target=self._tick_loop, name='health-monitor', daemon=True)
+        thread.start()
+        logger.info('Health monitor started')
+
+    def stop(self) -> None:
+        self.running = False
+
+    def _tick_loop(self) -> None:
+        while self.running:
+            time.sleep(self.wheel.resolution)
+            try:
+                with self.lock:
+                    fired = self.wheel.advance()
+
+                for key, callback in fired:
+                    callback(key)
+
+                self._send_pending()
+
+            except Exception as e:
+                logger.error('Error in health monitor tick:', exc_info=e)
+
+    # Update detector state from a single event in constant time
+    def observe(self, event) -> None:
+        try:
+            if event.get('Age', 0) > self.max_event_age:
+                return
+
+            event_type = event.get('Event Type')
+            data = event.get('Data') or {}
+            now = time.time()
+
+            with self.lock:
+                if event_type == 'Reward':
+                    self._observe_reward(event.get('Farmer Name'), data)
+
+                elif event_type == 'Failed to Send Solution':
+                    self._observe_failed_solution(event.get('Farmer Name'), data, now)
+
+                elif event_type in ['Idle Node', 'Syncing Node']:
+                    self._observe_idle_node(event.get('Node Name'), data)
+
+                elif self.reward_absence and data.get('Farm Index') is not None:
+                    # Arm the absence timer for farms that have not rewarded yet
+                    key = ('reward', event.get('Farmer Name'), int(data.get('Farm Index')))
+                    if key not in self.wheel.deadlines:
+                        self.wheel.schedule(key, self.reward_absence, self._reward_absent)
+
+        except Exception as e:
+            logger.error('Error evaluating health:', exc_info=e)
+
+    def _observe_reward(self, farmer, data) -> None:
+        farm_index = int(data.get('Farm Index'))
+        key = ('reward', farmer, farm_index)
+        self._clear(key, 'Reward Received', f'{farmer} farm {farm_index} received a reward again.')
+
+        if self.reward_absence:
+            self.wheel.schedule(key, self.reward_absence, self._reward_absent)
+
+    def _observe_failed_solution(self, farmer, data, now) -> None:
+        if not self.max_failed_solutions:
+            return
+
+        farm_index = int(data.get('Farm Index'))
+        key = ('failed', farmer, farm_index)
+        counter = self.failed_solutions.get(key)
+
+        if counter is None:
+            counter = SlidingWindowCounter(3600)
+            self.failed_solutions[key] = counter
+
+        count = counter.add(now)
+        if count > self.max_failed_solutions:
+            self._raise(key, 'Failed Solutions', f'{farmer} farm {farm_index} failed to send {count} solutions in the last hour.')
+        else:
+            self._clear(key, 'Failed Solutions Recovered', f'{farmer} farm {farm_index} failed to send {count} solutions in the last hour.')
+
+    def _observe_idle_node(self, node, data) -> None:
+        best = data.get('Best', 0)
+        finalized = data.get('Finalized', 0)
+        peers = data.get('Peers', 0)
+
+        if self.best_stall:
+            key = ('best', node)
+            if best > self.best_blocks.get(node, -1):
+                self.best_blocks[node] = best
+                self._clear(key, 'Best Block Advancing', f'{node} best block advanced to #{best}.')
+                self.wheel.schedule(key, self.best_stall, self._best_stalled)
+
+        if self.max_finalized_lag is not None:
+            key = ('finalized', node)
+            lag = best - finalized
+            if lag > self.max_finalized_lag:
+                self._raise(key, 'Finalization Lagging', f'{node} finalized #{finalized} is {lag} blocks behind best #{best}.')
+            else:
+                self._clear(key, 'Finalization Recovered', f'{node} finalized is {lag} blocks behind best.')
+
+        if self.min_peers is not None:
+            key = ('peers', node)
+            if peers < self.min_peers:
+                self._raise(key, 'Low Peers', f'{node} has {peers} peers (minimum {self.min_peers}).')
+            else:
+                self._clear(key, 'Peers Recovered', f'{node} has {peers} peers.')
+
+    # Timer wheel callbacks
+    def _reward_absent(self, key) -> None:
+        _, farmer, farm_index = key
+        hours = self.reward_absence / 3600
+        with self.lock:
+            self._raise(key, 'No Rewards', f'{farmer} farm {farm_index} has not received a reward in {hours:g} hours.')
+
+    def _best_stalled(self, key) -> None:
+        _, node = key
+        minutes = self.best_stall / 60
+        with self.lock:
+            self._raise(key, 'Best Block Stalled', f'{node} best block has not advanced past #{self.best_blocks.get(node)} in {minutes:g} minutes.')
+
+    # Alerts are sent once when a condition starts and once when it clears
+    def _raise(self, key, title, message) -> None:
+        if key in self.active_alerts:
+            return
+
+        self.active_alerts.add(key)
+        logger.warning(f'HEALTH: {title} - {message}')
+        self.pending_alerts.append((title, message, 'error'))
+
+    def _clear(self, key, title, message) -> None:
+        if key not in self.active_alerts:
+            return
+
+        self.active_alerts.discard(key)
+        logger.info(f'HEALTH: {title} - {message}')
+        self.pending_alerts.append((title, message, 'general'))
+
+    # Only called from the tick thread and outside the lock, so a slow webhook never blocks the stream
+    def _send_pending(self) -> None:
+        with self.lock:
+            alerts, self.pending_alerts = self.pending_alerts, []
+
+        discord_alerts = self.config.get('discord_alerts')
+        if not discord_alerts:
+            return
+
+        for title, message, alert_type in alerts:
+            Helpers.send_discord_notification(discord_alerts, title, message, alert_type, self.rate_limiter)
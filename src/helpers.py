@@ -1,7 +1,5 @@
 import os
-import yaml
 import datetime
-from src.discord_api import DiscordAPI
 from src.logger import logger
 
 class Helpers:
@@ -10,7 +8,10 @@ class Helpers:
         logger.info(f'Opening config from {file_path}')
         if not os.path.exists(file_path):
             return None
-        
+
+        # yaml is only needed by the main process, parser workers never load it
+        import yaml
+
         with open(file_path, 'r') as file:
             try:
                 data = yaml.safe_load(file)
@@ -19,6 +20,42 @@ class Helpers:
                 print(f"Error reading YAML file: {e}")
                 return None
             
+    @staticmethod
+    def load_config(file_path):
+        # Read and validate a config file, returns None when it can not be used
+        config = Helpers.read_yaml_file(file_path)
+
+        if not config:
+            logger.error(f'Error loading config from {file_path}. Are you sure you put in the right location?')
+            return None
+
+        missing_values = False
+        for key, value in config.items():
+            if value is None:
+                logger.error(f"None value found at key: {key}")
+                missing_values = True
+
+        if missing_values:
+            return None
+
+        return config
+
+    @staticmethod
+    def parse_event_datetime(value):
+        # Events carry either the raw log timestamp (2024-05-01T10:00:00.123456Z) or '%Y-%m-%d %H:%M:%S.%f', both UTC
+        value = value.rstrip('Z').replace('T', ' ')
+        if '.' in value:
+            seconds, fraction = value.split('.', 1)
+            value = f"{seconds}.{fraction[:6].ljust(6, '0')}"
+
+        return datetime.datetime.fromisoformat(value).replace(tzinfo=datetime.timezone.utc)
+
+    @staticmethod
+    def get_event_lag(event):
+        # Seconds between the log timestamp of an event and now
+        event_time = Helpers.parse_event_datetime(event.get('Datetime'))
+        return (datetime.datetime.now(datetime.timezone.utc) - event_time).total_seconds()
+
     @staticmethod
     def get_age_of_timestamp(timestamp):
         # Parse the UTC timestamp string to a datetime object
@@ -59,6 +96,9 @@ class Helpers:
                 alert_enabled = urls.get(alert_type) is not None
 
                 if alert_enabled:
+                    # discord and aiohttp are heavy, only load them once an alert is actually sent
+                    from src.discord_api import DiscordAPI
+
                     alert_url = urls.get(alert_type)
                     logger.info(f"DISCORD ({alert_type}): {title} - {message}")
                     DiscordAPI.send_discord_message(alert_url, message, title, alert_type)
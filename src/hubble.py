@@ -1,25 +1,48 @@
-import docker
-
+import os
 import sys
 import signal
+import threading
 import re
 import time
 import src.constants as constants
 import json
 
-from src.logger import logger
+from src.logger import logger, configure_logging
 
 from src.spaceport_api import SpaceportAPI
 from src.log_parser import LogParser
 from datetime import datetime, timedelta
 from src.rate_limiter import RateLimiter
 from src.helpers import Helpers
+from src.event_bus import EventBus
+from src.watermark import LagWatermark
+from src.sinks import create_sinks, reconcile_sinks
+from src.spaceport_router import SpaceportRouter
+
+# Config keys that are read when sinks are built
+SINK_CONFIG_KEYS = {'name', 'sinks', 'spaceport_url', 'discord_alerts', 'dedup', 'aggregator', 'rate_limit', 'spaceport_sharding'}
+
+# Config keys only read at startup, a reload keeps their current values
+RESTART_CONFIG_KEYS = {
+    'parse_workers', 'parse_batch_size', 'node_rpc', 'container_stats', 'disk_sampler', 'log_archive',
+    'metrics', 'docker_hosts', 'bootstrap', 'aggregator_listen', 'inventory_flush_seconds', 'config_reload', 'config_reload_interval'
+}
 
 class Hubble:
-    def __init__(self, config) -> None:
+    def __init__(self, config, timer=None, docker_client=None, config_path=None) -> None:
         # create config params
         self.config = config
 
+        # config file watched for changes, reloads are applied without restarting the stream
+        self.config_reloader = None
+        if config_path and self.config.get('config_reload', True):
+            from src.config_reloader import ConfigReloader
+            self.config_reloader = ConfigReloader(config_path, self.apply_config, interval=self.config.get('config_reload_interval', 5))
+        self.reload_lock = threading.Lock()
+
+        # optional startup timing report
+        self.timer = timer
+
         # docker container id for node
         self.docker_data = {
             'Container ID': None,
@@ -29,12 +52,87 @@ class Hubble:
             'Container IP': None
         }
 
+        # spaceport request timeouts, retries and circuit breaker
+        SpaceportAPI.configure(self.config)
+
+        # registration goes to the endpoint that owns this name
+        self.spaceport_router = SpaceportRouter(self.config)
+
         # rate limiter
-        self.rate_limiter = RateLimiter(limit=4, interval=60)
+        self.rate_limiter = self.create_rate_limiter(self.config)
         
-        # docker client
-        self.docker_client = docker.from_env()
-
+        # docker client, an aggregator only receives events from agents and docker_hosts brings its own clients
+        self.docker_client = docker_client
+        if self.docker_client is None and self.config.get('mode') != 'Aggregator' and not self.config.get('docker_hosts'):
+            import docker
+            self.docker_client = docker.from_env()
+
+        # health detectors, only enabled when thresholds are configured
+        self.health_monitor = None
+        if self.config.get('health'):
+            from src.health_monitor import HealthMonitor
+            self.health_monitor = HealthMonitor(self.config, self.rate_limiter)
+
+        # parsed events are published once and consumed by each configured sink
+        self.event_bus = EventBus()
+        for sink in create_sinks(self.config, self.rate_limiter):
+            self.event_bus.add_sink(sink)
+
+        # farm startup lines are collected per farm_index and registered in one write
+        self.farm_inventory = None
+        if self.config.get('mode') == 'Farmer' and not self.config.get('docker_hosts'):
+            from src.farm_inventory import FarmInventory
+            self.farm_inventory = FarmInventory(self.config['name'], self.event_bus.publish, flush_delay=self.config.get('inventory_flush_seconds', 10))
+
+        # in-memory time series of consensus and plotting metrics
+        self.metrics_store = None
+        if self.config.get('metrics'):
+            from src.timeseries import MetricsStore
+            metrics_config = self.config.get('metrics')
+            self.metrics_store = MetricsStore(metrics_config if isinstance(metrics_config, dict) else {})
+
+        # optional compressed archive of the raw log lines, seekable by time
+        self.log_archive = None
+        if self.config.get('log_archive'):
+            from src.log_archive import LogArchiveWriter
+            archive_config = self.config.get('log_archive')
+            if not isinstance(archive_config, dict):
+                archive_config = {}
+            self.log_archive = LogArchiveWriter(
+                archive_config.get('directory', './logs/archive'),
+                block_size=archive_config.get('block_size', 256 * 1024),
+                segment_size=archive_config.get('segment_size', 64 * 1024 * 1024),
+                flush_interval=archive_config.get('flush_interval', 60),
+                max_segments=archive_config.get('max_segments')
+            )
+
+        # lag between the newest log timestamp and wall-clock time, drives catch-up mode,
+        # agents and docker hosts call handle_event from one thread each
+        self.watermark = LagWatermark(self.config)
+        self.watermark_lock = threading.Lock()
+
+        # optional multi-process parsing for very high line rates
+        self.parallel_parser = None
+
+        # json-file log of the container, read backward to seed state before streaming
+        self.container_log_path = None
+        self.stream_since = None
+
+        # optional container resource stats, started once the container is known
+        self.stats_collector = None
+
+        # optional node JSON-RPC poller, replaces the Idle Node log line as the consensus source
+        self.node_poller = None
+
+        # optional per-farm disk sampler, farm directories are mapped through the container mounts
+        self.disk_sampler = None
+        self.container_mounts = []
+
+
+    @staticmethod
+    def create_rate_limiter(config):
+        rate_limit = config.get('rate_limit') or {}
+        return RateLimiter(limit=rate_limit.get('limit', 4), interval=rate_limit.get('interval', 60))
 
     # Get the container info from Docker
     def get_container(self) -> None:
@@ -62,6 +160,8 @@ class Hubble:
                 self.docker_data['Container Status'] = match.status
                 self.docker_data['Container Started At'] = match.attrs.get('State').get('StartedAt')
                 self.docker_data['Container IP'] = match.attrs.get('NetworkSettings').get('Networks')[network_mode].get('IPAddress')
+                self.container_mounts = match.attrs.get('Mounts') or []
+                self.container_log_path = match.attrs.get('LogPath')
 
                 if self.config.get('mode') == 'Farmer':
                     for value in match.attrs['Args']:
@@ -80,9 +180,28 @@ class Hubble:
             logger.error(f'Unable to get container: {e}')
             sys.exit(1)
 
-    def register_node(self) -> None:
+    # Agents that only forward to an aggregator have it register them, Spaceport may not be reachable from here
+    def register(self) -> None:
+        sinks = {sink.name: sink for sink in self.event_bus.sinks}
+        if 'aggregator' in sinks and 'spaceport' not in sinks:
+            logger.info(f"Registering {self.config.get('mode')} through aggregator {sinks['aggregator'].address}")
+            sinks['aggregator'].register(self.config.get('mode'), self.docker_data, self.config.get('host_ip'))
+            return
+
+        if self.config.get('mode') == 'Node':
+            self.register_node()
+        elif self.config.get('mode') == 'Farmer':
+            self.register_farmer()
+
+    # Remote containers from docker_hosts register through the same path with their own name and docker data
+    def register_node(self, name=None, docker_data=None, host_ip=None) -> None:
+        name = name or self.config.get('name')
+        docker_data = docker_data or self.docker_data
+        host_ip = host_ip or self.config.get('host_ip')
+
         try:
-            nodes = SpaceportAPI.get_nodes(self.config.get('spaceport_url'))
+            base_url = self.spaceport_router.route(name)
+            nodes = SpaceportAPI.get_nodes(base_url)
 
             if nodes == None:
                 logger.error('Failed to register Node. Exiting')
@@ -92,84 +211,92 @@ class Hubble:
 
             node_exists = False
             for node in nodes:
-                if node.get('name') == self.config.get('name'):
+                if node.get('name') == name:
                     node_exists = True
                     break
 
             if node_exists:
                 logger.info('Found Node. Updating Node registration')
-                SpaceportAPI.update_node(self.config.get('spaceport_url'), {
-                    'name': self.config.get('name'),
+                SpaceportAPI.update_node(base_url, {
+                    'name': name,
                     'status': 'Initializing',
                     'active': True,
-                    'hostIp': self.config.get('host_ip'),
-                    'containerIp': self.docker_data.get('Container IP'),
-                    'containerStatus': self.docker_data.get('Container Status'),
-                    'version': self.docker_data.get('Image Version'),
-                    'containerStartedAt': self.docker_data.get('Container Started At')
+                    'hostIp': host_ip,
+                    'containerIp': docker_data.get('Container IP'),
+                    'containerStatus': docker_data.get('Container Status'),
+                    'version': docker_data.get('Image Version'),
+                    'containerStartedAt': docker_data.get('Container Started At')
                 })
 
             else:
                 logger.info('Registering Node with Spaceport API')
-                SpaceportAPI.insert_node(self.config.get('spaceport_url'), {
+                SpaceportAPI.insert_node(base_url, {
                     'status': 'Initializing',
                     'active': True,
-                    'hostIp': self.config.get('host_ip'),
-                    'containerIp': self.docker_data.get('Container IP'),
-                    'containerStatus': self.docker_data.get('Container Status'),
-                    'version': self.docker_data.get('Image Version'),
-                    'containerStartedAt': self.docker_data.get('Container Started At')
+                    'hostIp': host_ip,
+                    'containerIp': docker_data.get('Container IP'),
+                    'containerStatus': docker_data.get('Container Status'),
+                    'version': docker_data.get('Image Version'),
+                    'containerStartedAt': docker_data.get('Container Started At')
                 })
 
         except Exception as e:
             logger.error(f'Error registering Node with Spaceport API: {e}')
             sys.exit(1)
 
-    def register_farmer(self) -> None:
+    def register_farmer(self, name=None, docker_data=None) -> None:
+        name = name or self.config.get('name')
+        docker_data = docker_data or self.docker_data
+
         try:
-            farmers = SpaceportAPI.get_farmers(self.config.get('spaceport_url'))
+            base_url = self.spaceport_router.route(name)
+            farmers = SpaceportAPI.get_farmers(base_url)
             
             if farmers == None:
                 logger.error('Failed to register Farmer. Exiting')
                 sys.exit(1)
 
             logger.info(f"Found {len(farmers)} Farmer(s). Checking if current Farmer is already registered")
-            nodes = SpaceportAPI.get_nodes(self.config.get('spaceport_url'))
 
-            node = None
+            # The farmer's node may be registered on any shard
+            nodes = []
+            for url in self.spaceport_router.urls:
+                nodes.extend(SpaceportAPI.get_nodes(url) or [])
+
+            node_name = None
 
             for node in nodes:
-                if node['hostIp'] == self.docker_data.get('Node IP') or node['containerIp'] == self.docker_data.get('Node IP'):
-                    node = node['name']
+                if node['hostIp'] == docker_data.get('Node IP') or node['containerIp'] == docker_data.get('Node IP'):
+                    node_name = node['name']
 
             farmer_exists = False
             for farmer in farmers:
-                if farmer.get('name') == self.config.get('name'):
+                if farmer.get('name') == name:
                     farmer_exists = True
                     break
             
             if farmer_exists:
                 logger.info('Found Farmer. Updating Farmer registration')
-                SpaceportAPI.update_farmer(self.config.get('spaceport_url'), {
-                    'name': self.config.get('name'),
+                SpaceportAPI.update_farmer(base_url, {
+                    'name': name,
                     'active': True,
                     'pieceCachePct': None,
                     'workers': None,
-                    'nodeIp': self.docker_data.get('Node IP'),
-                    'containerIp': self.docker_data.get('Container IP'),
-                    'nodeName': node,
-                    'version': self.docker_data.get('Image Version'),
-                    'containerStartedAt': self.docker_data.get('Container Started At')
+                    'nodeIp': docker_data.get('Node IP'),
+                    'containerIp': docker_data.get('Container IP'),
+                    'nodeName': node_name,
+                    'version': docker_data.get('Image Version'),
+                    'containerStartedAt': docker_data.get('Container Started At')
                 })
             else:
                 logger.info('Registering Farmer with Spaceport API')
-                SpaceportAPI.insert_farmer(self.config.get('spaceport_url'), {
+                SpaceportAPI.insert_farmer(base_url, {
                     'active': True,
-                    'nodeIp': self.docker_data.get('Node IP'),
-                    'containerIp': self.docker_data.get('Container IP'),
-                    'nodeName': node,
-                    'version': self.docker_data.get('Image Version'),
-                    'containerStartedAt': self.docker_data.get('Container Started At')
+                    'nodeIp': docker_data.get('Node IP'),
+                    'containerIp': docker_data.get('Container IP'),
+                    'nodeName': node_name,
+                    'version': docker_data.get('Image Version'),
+                    'containerStartedAt': docker_data.get('Container Started At')
                 })
 
         except Exception as e:
@@ -243,6 +370,17 @@ class Hubble:
     def signal_handler(self, sig, frame) -> None:
         print('SIGINT Received, shutting down stream...')
         # Perform any cleanup actions here if needed
+        self.watermark.stop()
+        with self.watermark_lock:
+            for coalesced in self.watermark.drain():
+                self.event_bus.publish(coalesced)
+        self.event_bus.stop()
+        if self.parallel_parser:
+            self.parallel_parser.close()
+        if self.metrics_store and self.metrics_store.path:
+            self.metrics_store.snapshot(self.metrics_store.path)
+        if self.log_archive:
+            self.log_archive.close()
         sys.exit(0)
 
     # Monitor Log Stream, Parse Logs into Events, Handle Events
@@ -253,7 +391,10 @@ class Hubble:
 
             if container:
                 logger.info(f"Connected to container")
-                signal.signal(signal.SIGINT, self.signal_handler)
+
+                # Signal handlers can only be installed from the main thread
+                if threading.current_thread() is threading.main_thread():
+                    signal.signal(signal.SIGINT, self.signal_handler)
 
                 while True:
                     try:
@@ -261,37 +402,29 @@ class Hubble:
                         container.reload()
                         if container.status == 'running':
 
-                            generator = container.logs(stdout=True, stderr=True, stream=True)
+                            # After a bootstrap or a finished stream only newer lines are requested
+                            if self.stream_since:
+                                generator = container.logs(stdout=True, stderr=True, stream=True, since=self.stream_since)
+                            else:
+                                generator = container.logs(stdout=True, stderr=True, stream=True)
 
-                            for log in generator:
-                                log_str = log.decode('utf-8').strip()
+                            if self.log_archive:
+                                generator = self.log_archive.tee(generator)
+
+                            if self.parallel_parser:
+                                for event in self.parallel_parser.parse_stream(generator):
+                                    self.dispatch_event(event)
+                                continue
 
-                                if log_str == "Error grabbing logs: invalid character 'l' after object key:value pair":
+                            for log in generator:
+                                if log.startswith(constants.BROKEN_STREAM_LOG):
                                     logger.error("Due to how log rotation works, the log stream is broken until you redeploy your container.")
 
-                                if self.config['mode'] == 'Farmer':
-                                    pattern = r"^(?P<timestamp>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}.\d+Z)\s*(?P<level>\w+)\s*(?P<data>.*)$"
-                                    match = re.match(pattern, log_str)
-
-                                    if match:
-                                        self.parse_log(
-                                            match.group("timestamp"),
-                                            match.group("level"),
-                                            match.group("data")
-                                        )
-
-                                elif self.config['mode'] == 'Node':
-                                    pattern = r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+Z)\s+(\w+)\s+(.*)'
-                                    match = re.match(pattern, log_str)
-                                    
-                                    if match:
-                                        timestamp, level, data = match.groups()
-
-                                        self.parse_log(
-                                            timestamp,
-                                            level,
-                                            data
-                                        )
+                                self.parse_log(log)
+
+                            # The stream ends when the container stops, its lines are not needed again
+                            if self.stream_since:
+                                self.stream_since = time.time()
                         else:
                             logger.warn(f"Container currently has a status of {container.status}. Sleeping 10 seconds before checking again...")
                             time.sleep(10)
@@ -308,41 +441,72 @@ class Hubble:
             logger.error("Error in Log Stream Monitor:", exc_info=e)
 
     # Parse Logs into Events
-    def parse_log(self, timestamp, level, data) -> None:
+    def parse_log(self, log) -> None:
         try:
-            event = LogParser.get_log_event(self.config['name'], timestamp, level, data)
-            if event and event.get('Event Type') != 'Unknown':
+            event = LogParser.parse_raw_line(self.config['name'], self.config['mode'], log)
+            if event:
                 self.handle_event(event)
 
-            elif event.get('Event Type') == 'Unknown':
-                pass
-            else:
-                logger.error('Unable to evaluate event. This happens the parser cannot find a match for a known event.')
-                logger.info(f"Unevaluated Data: {data}")
-
         except Exception as e:
             logger.error("Error evaluating log:", exc_info=e)
 
 
+    # Handle an event that was already parsed by a worker process
+    def dispatch_event(self, event) -> None:
+        try:
+            self.handle_event(event)
+        except Exception as e:
+            logger.error("Error handling event:", exc_info=e)
+
     def handle_event(self, event):
-        base_url = self.config.get('spaceport_url')
-        if self.config['mode'] == 'Farmer':
-            inserted = SpaceportAPI.insert_farmer_event(base_url, event)
-        elif self.config['mode'] == 'Node':
-            inserted = SpaceportAPI.insert_node_event(base_url, event)
-        
-        if inserted and self.config.get('mode') == 'Node':
-            logger.info(f"Inserting {event['Event Type']}")
+        # With the RPC poller running the Idle Node log line would only duplicate its records, its speeds are kept for the next poll
+        polled = (event.get('Data') or {}).get('Source') == 'RPC'
+        if self.node_poller and event.get('Event Type') == 'Idle Node' and not polled:
+            self.node_poller.observe_log(event)
+            return
 
-            if event['Event Type'] == 'Idle Node':
-                SpaceportAPI.insert_consensus(base_url, event)
-                SpaceportAPI.update_node(base_url, {
-                    'name': event.get('Node Name'),
-                    'status': 'Idle'
-                })
+        if self.health_monitor:
+            self.health_monitor.observe(event)
+
+        if self.disk_sampler:
+            self.disk_sampler.observe(event)
+
+        if self.metrics_store:
+            self.metrics_store.observe(event)
+
+        with self.watermark_lock:
+            # Polled events are stamped with the current time and say nothing about log lag
+            if not polled and self.watermark.observe(event):
+                self.event_bus.set_catch_up(self.watermark.catching_up)
+
+                # Back to live, release whatever was held back
+                if not self.watermark.catching_up:
+                    for coalesced in self.watermark.drain():
+                        self.event_bus.publish(coalesced)
+
+            if self.farm_inventory and self.farm_inventory.absorb(event):
+                return
+
+            if self.watermark.catching_up and not polled:
+                event['Catch Up'] = True
+
+                if self.watermark.due():
+                    for coalesced in self.watermark.drain():
+                        self.event_bus.publish(coalesced)
+
+                if self.watermark.coalesce(event):
+                    return
+
+            for held in self.watermark.release(event):
+                self.event_bus.publish(held)
 
-            elif event['Event Type'] in ['Vote', 'Block']:
-                SpaceportAPI.insert_claim(base_url, event)
+        self.event_bus.publish(event)
+
+    def flush_coalesced(self) -> None:
+        with self.watermark_lock:
+            if self.watermark.due():
+                for coalesced in self.watermark.drain():
+                    self.event_bus.publish(coalesced)
 
                     # elif event['Event Type'] == 'Claimed Vote':
                     #     if event['Age'] < self.discord_publish_threshold:
@@ -494,17 +658,310 @@ class Hubble:
     def run(self) -> None:
         logger.info(f"Initializing hubble {constants.VERSIONS['hubble']} in {self.config.get('mode')} mode.")
 
+        if self.config.get('mode') == 'Aggregator':
+            self.run_aggregator()
+            return
+
+        if self.config.get('docker_hosts'):
+            self.run_fleet()
+            return
+
         # Get Container information
         self.get_container()
+        self.mark_startup('get container')
 
         # Register Farmer/Node
-        if self.config.get('mode') == 'Node':
-            self.register_node()
-        elif self.config.get('mode') == 'Farmer':
-            self.register_farmer()
+        self.register()
+        self.mark_startup('register')
 
         # Verify versions
         self.check_version()
+        self.mark_startup('check version')
+
+        # Start parser worker processes
+        if self.config.get('parse_workers'):
+            logger.info(f"Starting {self.config.get('parse_workers')} parser worker processes")
+            from src.parallel_parser import ParallelParser
+            self.parallel_parser = ParallelParser(
+                self.config['name'],
+                self.config['mode'],
+                self.config.get('parse_workers'),
+                batch_size=self.config.get('parse_batch_size', 500)
+            )
+
+        # Start sink workers
+        self.event_bus.start()
+        self.watermark.start(self.flush_coalesced)
+        if self.farm_inventory:
+            self.farm_inventory.start()
+
+        # Start health detectors
+        if self.health_monitor:
+            self.health_monitor.start()
+
+        # Periodic metrics snapshots
+        if self.metrics_store:
+            self.metrics_store.start()
+
+        # Flush archived log blocks on a timer while the stream is quiet
+        if self.log_archive:
+            self.log_archive.start()
+
+        # Stream container resource stats next to the logs
+        if self.config.get('container_stats'):
+            self.start_stats_collector()
+
+        # Poll the node over JSON-RPC for consensus state
+        if self.config.get('node_rpc') and self.config.get('mode') == 'Node':
+            self.start_node_poller()
+
+        # Sample the disks behind each farm directory
+        if self.config.get('disk_sampler') and self.config.get('mode') == 'Farmer':
+            self.start_disk_sampler()
+
+        # Watch the config file and SIGHUP for changes
+        if self.config_reloader:
+            self.config_reloader.start()
+
+        # Seed state from the end of the log instead of replaying it
+        if self.config.get('bootstrap'):
+            self.bootstrap_state()
+
+        self.mark_startup('start subsystems')
+        if self.timer:
+            self.timer.report()
 
         # # Start Log Stream Monitor
         self.log_stream_monitor()
+
+    # Receive events from hubble agents and write them through the local sinks
+    def run_aggregator(self) -> None:
+        from src.aggregator import AggregatorServer, DEFAULT_LISTEN
+
+        signal.signal(signal.SIGINT, self.signal_handler)
+        self.event_bus.start()
+        self.watermark.start(self.flush_coalesced)
+        if self.health_monitor:
+            self.health_monitor.start()
+        if self.metrics_store:
+            self.metrics_store.start()
+        if self.config_reloader:
+            self.config_reloader.start()
+
+        server = AggregatorServer(self.config.get('aggregator_listen', DEFAULT_LISTEN), self.handle_event, event_bus=self.event_bus, register=self.register_agent)
+        server.serve_forever()
+
+    def register_agent(self, registration) -> None:
+        name = registration.get('name')
+        logger.info(f"Registering {registration.get('mode')} {name} for its agent")
+        try:
+            if registration.get('mode') == 'Node':
+                self.register_node(name, registration.get('docker_data'), registration.get('host_ip'))
+            elif registration.get('mode') == 'Farmer':
+                self.register_farmer(name, registration.get('docker_data'))
+        except SystemExit:
+            logger.error(f'Unable to register agent {name}, accepting its events anyway')
+
+    def start_stats_collector(self) -> None:
+        from src.container_stats import ContainerStatsCollector
+
+        stats_config = self.config.get('container_stats') or {}
+        if not isinstance(stats_config, dict):
+            stats_config = {}
+
+        container = self.docker_client.containers.get(self.docker_data['Container ID'])
+        self.stats_collector = ContainerStatsCollector(
+            container,
+            self.config['name'],
+            self.config['mode'],
+            self.event_bus.publish,
+            interval=stats_config.get('interval', 60)
+        )
+        self.stats_collector.start()
+
+    def bootstrap_state(self) -> None:
+        from src.log_bootstrap import LogBootstrap
+
+        bootstrap_config = self.config.get('bootstrap') or {}
+        if not isinstance(bootstrap_config, dict):
+            bootstrap_config = {}
+
+        log_path = self.container_log_path
+        if not log_path:
+            logger.warning('Container has no json-file log, replaying the log stream instead')
+            return
+
+        log_path = bootstrap_config.get('log_path_prefix', '').rstrip('/') + log_path
+        if not os.access(log_path, os.R_OK):
+            logger.warning(f'Unable to read {log_path}, replaying the log stream instead')
+            return
+
+        bootstrap = LogBootstrap(
+            log_path,
+            self.config['name'],
+            self.config['mode'],
+            block_size=bootstrap_config.get('block_size', 1024 * 1024),
+            max_bytes=bootstrap_config.get('max_bytes'),
+            farms=bootstrap_config.get('farms')
+        )
+
+        try:
+            events = bootstrap.run()
+        except Exception as e:
+            logger.error('Error bootstrapping state, replaying the log stream instead:', exc_info=e)
+            return
+
+        for event in events:
+            self.dispatch_event(event)
+        self.stream_since = bootstrap.since
+
+    def start_node_poller(self) -> None:
+        from src.node_rpc import NodeRpcPoller
+
+        rpc_config = self.config.get('node_rpc') or {}
+        if not isinstance(rpc_config, dict):
+            rpc_config = {}
+
+        url = rpc_config.get('url') or f"http://{self.docker_data.get('Container IP')}:{rpc_config.get('port', 9944)}"
+        self.node_poller = NodeRpcPoller(
+            url,
+            self.config['name'],
+            self.dispatch_event,
+            interval=rpc_config.get('interval', 10),
+            timeout=rpc_config.get('timeout', 5)
+        )
+        self.node_poller.start()
+
+    def start_disk_sampler(self) -> None:
+        from src.disk_sampler import FarmDiskSampler
+
+        sampler_config = self.config.get('disk_sampler') or {}
+        if not isinstance(sampler_config, dict):
+            sampler_config = {}
+
+        self.disk_sampler = FarmDiskSampler(
+            self.config['name'],
+            self.container_mounts,
+            self.event_bus.publish,
+            interval=sampler_config.get('interval', 30),
+            host_prefix=sampler_config.get('host_prefix', '')
+        )
+        self.disk_sampler.start()
+
+    # Swap the components a reloaded config touches, the docker stream and in-memory state keep running
+    def apply_config(self, config) -> None:
+        with self.reload_lock:
+            old = self.config
+            if config.get('mode') != old.get('mode'):
+                logger.error(f"Changing mode from {old.get('mode')} to {config.get('mode')} requires a restart, keeping the current config")
+                return
+
+            changed = {key for key in set(old) | set(config) if old.get(key) != config.get(key)}
+            if not changed:
+                logger.info('Config unchanged')
+                return
+
+            restart = changed & RESTART_CONFIG_KEYS
+            if restart:
+                logger.warning(f"Changes to {', '.join(sorted(restart))} require a restart, keeping the current values")
+                for key in restart:
+                    if key in old:
+                        config[key] = old[key]
+                    else:
+                        config.pop(key, None)
+                changed -= restart
+
+            if not changed:
+                return
+
+            logger.info(f"Applying config changes: {', '.join(sorted(changed))}")
+
+            if 'logging' in changed:
+                configure_logging(config)
+
+            if 'spaceport_breaker' in changed:
+                SpaceportAPI.configure(config)
+
+            if 'spaceport_url' in changed or 'spaceport_sharding' in changed:
+                self.spaceport_router = SpaceportRouter(config)
+
+            if 'catch_up' in changed:
+                self.watermark.configure(config)
+
+            if 'rate_limit' in changed:
+                self.rate_limiter = self.create_rate_limiter(config)
+
+            if changed & {'health', 'discord_alerts', 'rate_limit'}:
+                self.apply_health_config(config)
+
+            # Sinks keep their queues and state, only those with changed options are rebuilt
+            if changed & SINK_CONFIG_KEYS:
+                self.event_bus.replace_sinks(reconcile_sinks(self.event_bus.sinks, old, config, self.rate_limiter))
+
+            if 'name' in changed:
+                if self.farm_inventory:
+                    self.farm_inventory.farmer_name = config['name']
+                if self.parallel_parser:
+                    self.parallel_parser.name = config['name']
+                if self.node_poller:
+                    self.node_poller.node_name = config['name']
+                if self.stats_collector:
+                    self.stats_collector.name = config['name']
+                if self.disk_sampler:
+                    self.disk_sampler.farmer_name = config['name']
+
+            self.config = config
+
+            # A new name is registered the same way as at startup, a failure must not stop the watcher
+            if 'name' in changed or 'spaceport_url' in changed:
+                try:
+                    self.register()
+                except SystemExit:
+                    logger.error(f"Unable to register {config.get('name')} after config reload")
+
+    def apply_health_config(self, config) -> None:
+        if not config.get('health'):
+            if self.health_monitor:
+                self.health_monitor.stop()
+                self.health_monitor = None
+            return
+
+        if self.health_monitor:
+            self.health_monitor.rate_limiter = self.rate_limiter
+            self.health_monitor.configure(config)
+            return
+
+        from src.health_monitor import HealthMonitor
+        self.health_monitor = HealthMonitor(config, self.rate_limiter)
+        self.health_monitor.start()
+
+    # Stream the containers of every configured docker host through the local sinks
+    def run_fleet(self) -> None:
+        from src.docker_hosts import DockerHostSupervisor
+
+        signal.signal(signal.SIGINT, self.signal_handler)
+        self.event_bus.start()
+        self.watermark.start(self.flush_coalesced)
+        if self.health_monitor:
+            self.health_monitor.start()
+        if self.metrics_store:
+            self.metrics_store.start()
+        if self.config_reloader:
+            self.config_reloader.start()
+
+        supervisor = DockerHostSupervisor(self.config['docker_hosts'], self.dispatch_event, self.register_target)
+        supervisor.serve_forever()
+
+    def register_target(self, target) -> None:
+        logger.info(f'Registering {target.mode} {target.name} on docker host {target.host.name}')
+        try:
+            if target.mode == 'Node':
+                self.register_node(target.name, target.docker_data, target.host.config.get('host_ip'))
+            elif target.mode == 'Farmer':
+                self.register_farmer(target.name, target.docker_data)
+        except SystemExit:
+            logger.error(f'Unable to register {target.name}, streaming its events anyway')
+
+    def mark_startup(self, stage) -> None:
+        if self.timer:
+            self.timer.mark(stage)
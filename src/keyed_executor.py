@@ -0,0 +1,104 @@
+import collections
+import threading
+
+from src.logger import logger
+
+class KeyedExecutor:
+    # Tasks with the same key run one at a time in submission order, different keys run in parallel
+    def __init__(self, workers=8, max_pending=10000, name='keyed') -> None:
+        self.workers = workers
+        self.name = name
+
+        self.pending = {}
+        self.ready = collections.deque()
+        self.condition = threading.Condition()
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+        self.threads = []
+        self.running = False
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        self.running = True
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f'{self.name}-{index}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    # Blocks once max_pending tasks are waiting, which backs up into the sink queue
+    def submit(self, key, fn, *args) -> None:
+        self.slots.acquire()
+        with self.condition:
+            queue = self.pending.get(key)
+            if queue is None:
+                queue = self.pending[key] = collections.deque()
+
+                # A key is only in ready while no worker holds it, that keeps its tasks in order
+                self.ready.append(key)
+                self.condition.notify()
+
+            queue.append((fn, args))
+
+    def _worker(self) -> None:
+        while True:
+            with self.condition:
+                while not self.ready:
+                    if not self.running:
+                        return
+                    self.condition.wait(0.5)
+
+                key = self.ready.popleft()
+                fn, args = self.pending[key].popleft()
+                self.active += 1
+
+            failed = False
+            try:
+                fn(*args)
+            except Exception as e:
+                failed = True
+                logger.error(f'Error in {self.name} task for {key}:', exc_info=e)
+
+            self.slots.release()
+            with self.condition:
+                self.active -= 1
+                self.completed += 1
+                self.failed += failed
+
+                # Requeue at the back so one busy key can not starve the others
+                if self.pending[key]:
+                    self.ready.append(key)
+                    self.condition.notify()
+                else:
+                    del self.pending[key]
+
+                self.condition.notify_all()
+
+    # Wait until every submitted task has run
+    def drain(self, timeout=None) -> bool:
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.active, timeout)
+
+    def shutdown(self, timeout=5) -> None:
+        self.drain(timeout)
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def depth(self):
+        with self.condition:
+            return {key: len(queue) for key, queue in self.pending.items() if queue}
+
+    def metrics(self):
+        with self.condition:
+            return {
+                'workers': self.workers,
+                'active': self.active,
+                'pending': sum(len(queue) for queue in self.pending.values()),
+                'keys': len(self.pending),
+                'completed': self.completed,
+                'failed': self.failed
+            }
@@ -0,0 +1,203 @@
+import glob
+import os
+import struct
+import threading
+import time
+import zlib
+
+from src.helpers import Helpers
+from src.log_parser import LogParser
+from src.logger import logger
+
+# Index entry per block: first and last log time, offset and length in the segment, line count
+INDEX_ENTRY = struct.Struct('!ddQII')
+
+def line_time(line, default=None):
+    # Raw lines start with the RFC 3339 timestamp of the container log
+    try:
+        return Helpers.parse_event_datetime(line.split(None, 1)[0].decode('ascii')).timestamp()
+    except Exception:
+        return default
+
+
+class LogArchiveWriter:
+    def __init__(self, directory, block_size=256 * 1024, segment_size=64 * 1024 * 1024, flush_interval=60, max_segments=None, level=6) -> None:
+        self.directory = directory
+        self.block_size = block_size
+        self.segment_size = segment_size
+        self.flush_interval = flush_interval
+        self.max_segments = max_segments
+        self.level = level
+
+        self.lines = []
+        self.buffered = 0
+        self.block_started = None
+        self.last_time = None
+
+        self.segment = None
+        self.index = None
+        self.segment_bytes = 0
+
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+        # tee() runs on the log reader thread, the flush timer and close() on others
+        self.lock = threading.RLock()
+        self.running = False
+        self.closed = False
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    # A quiet stream still gets its buffered block written after flush_interval
+    def start(self) -> None:
+        self.running = True
+        threading.Thread(target=self._flush_loop, name='log-archive', daemon=True).start()
+
+    def _flush_loop(self) -> None:
+        while self.running:
+            time.sleep(min(1.0, self.flush_interval))
+            try:
+                with self.lock:
+                    if self.block_started is not None and time.monotonic() - self.block_started >= self.flush_interval:
+                        self.flush()
+            except Exception as e:
+                logger.error('Error flushing log archive:', exc_info=e)
+
+    # Archive every line of a log generator while passing it through
+    def tee(self, generator):
+        for log in generator:
+            self.append(log)
+            yield log
+
+    def append(self, line) -> None:
+        if not line.endswith(b'\n'):
+            line += b'\n'
+
+        with self.lock:
+            if self.closed:
+                return
+
+            if self.block_started is None:
+                self.block_started = time.monotonic()
+
+            self.lines.append(line)
+            self.buffered += len(line)
+
+            if self.buffered >= self.block_size or time.monotonic() - self.block_started >= self.flush_interval:
+                self.flush()
+
+    # Compress the buffered lines into one block and index it by log time
+    def flush(self) -> None:
+        with self.lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self.lines:
+            return
+
+        first_time = line_time(self.lines[0], self.last_time or time.time())
+        last_time = max(first_time, line_time(self.lines[-1], first_time))
+        self.last_time = last_time
+
+        raw = b''.join(self.lines)
+        block = zlib.compress(raw, self.level)
+
+        if self.segment is None or self.segment_bytes >= self.segment_size:
+            self._open_segment(first_time)
+
+        offset = self.segment_bytes
+        self.segment.write(block)
+        self.segment.flush()
+        self.index.write(INDEX_ENTRY.pack(first_time, last_time, offset, len(block), len(self.lines)))
+        self.index.flush()
+
+        self.segment_bytes += len(block)
+        self.raw_bytes += len(raw)
+        self.compressed_bytes += len(block)
+
+        self.lines = []
+        self.buffered = 0
+        self.block_started = None
+
+    def _open_segment(self, first_time) -> None:
+        self.close_segment()
+
+        base = os.path.join(self.directory, f'{int(first_time)}-{os.getpid()}-{int(time.time() * 1000)}')
+        self.segment = open(f'{base}.logz', 'ab')
+        self.index = open(f'{base}.idx', 'ab')
+        self.segment_bytes = 0
+        logger.info(f'Archiving raw log lines to {base}.logz')
+
+        # Oldest segments go first once the retention limit is reached
+        if self.max_segments:
+            segments = sorted(glob.glob(os.path.join(self.directory, '*.logz')), key=os.path.getmtime)
+            for path in segments[:-self.max_segments]:
+                os.remove(path)
+                if os.path.exists(path[:-len('.logz')] + '.idx'):
+                    os.remove(path[:-len('.logz')] + '.idx')
+
+    def close_segment(self) -> None:
+        if self.segment:
+            self.segment.close()
+            self.index.close()
+            self.segment = None
+            self.index = None
+
+    def close(self) -> None:
+        self.running = False
+        with self.lock:
+            self.flush()
+            self.close_segment()
+            self.closed = True
+
+        if self.raw_bytes:
+            logger.info(f'Archived {self.raw_bytes / 1024 / 1024:.1f} MB of log lines in {self.compressed_bytes / 1024 / 1024:.1f} MB')
+
+
+class LogArchiveReader:
+    def __init__(self, directory) -> None:
+        self.directory = directory
+
+    def read_index(self, index_path):
+        entries = []
+        with open(index_path, 'rb') as file:
+            data = file.read()
+
+        # A partially written last entry is ignored
+        for position in range(0, len(data) - INDEX_ENTRY.size + 1, INDEX_ENTRY.size):
+            entries.append(INDEX_ENTRY.unpack_from(data, position))
+        return entries
+
+    def blocks(self, start=None, end=None):
+        # (segment path, offset, length) of every block that may hold lines in [start, end]
+        for index_path in sorted(glob.glob(os.path.join(self.directory, '*.idx'))):
+            segment_path = index_path[:-len('.idx')] + '.logz'
+            if not os.path.exists(segment_path):
+                continue
+
+            for first_time, last_time, offset, length, _ in self.read_index(index_path):
+                if (end is None or first_time <= end) and (start is None or last_time >= start):
+                    yield segment_path, offset, length, first_time, last_time
+
+    # Only the blocks overlapping the range are read and decompressed
+    def lines(self, start=None, end=None):
+        for segment_path, offset, length, first_time, last_time in self.blocks(start, end):
+            with open(segment_path, 'rb') as file:
+                file.seek(offset)
+                raw = zlib.decompress(file.read(length))
+
+            # Blocks fully inside the range need no per-line time check
+            inside = (start is None or first_time >= start) and (end is None or last_time <= end)
+            for line in raw.splitlines(keepends=True):
+                if not inside:
+                    timestamp = line_time(line)
+                    if timestamp is not None and ((start is not None and timestamp < start) or (end is not None and timestamp > end)):
+                        continue
+                yield line
+
+    # Re-run the parser over an archived window
+    def events(self, name, mode, start=None, end=None):
+        for line in self.lines(start, end):
+            event = LogParser.parse_raw_line(name, mode, line)
+            if event:
+                yield event
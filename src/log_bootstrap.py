@@ -0,0 +1,128 @@
+import json
+import os
+import time
+
+from src.helpers import Helpers
+from src.log_parser import LogParser, KEY_EVENTS_PATTERN
+from src.logger import logger
+
+PIECE_CACHE_EVENTS = ['Piece Cache Sync', 'Synchronizing Piece Cache', 'Finished Piece Cache Sync']
+INVENTORY_EVENTS = ['Farm ID', 'Farm Public Key', 'Farm Allocated Space', 'Farm Directory']
+
+def read_lines_backward(path, block_size=1024 * 1024, max_bytes=None):
+    # Yields complete lines from the end of the file towards the start
+    with open(path, 'rb') as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        stop = max(0, position - max_bytes) if max_bytes else 0
+        remainder = b''
+
+        while position > stop:
+            size = min(block_size, position - stop)
+            position -= size
+            file.seek(position)
+            lines = (file.read(size) + remainder).split(b'\n')
+
+            # The first piece may be cut off, it is completed by the next block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+
+        if remainder and position == 0:
+            yield remainder
+
+
+class StateTracker:
+    # Keeps the first (newest) event seen for every tracked field
+    def __init__(self, mode, farms=None) -> None:
+        self.mode = mode
+        self.farms = farms
+        self.latest = {}
+
+    def key(self, event):
+        event_type = event.get('Event Type')
+        data = event.get('Data') or {}
+        farm_index = data.get('Farm Index')
+
+        if event_type == 'Idle Node':
+            return ('consensus',)
+        if event_type in PIECE_CACHE_EVENTS:
+            return ('piece cache',)
+        if event_type in INVENTORY_EVENTS and farm_index is not None:
+            return (event_type, int(farm_index))
+        if data.get('Farm Status') and farm_index is not None:
+            return ('farm status', int(farm_index))
+        return None
+
+    def observe(self, event) -> None:
+        key = self.key(event)
+        if key is not None and key not in self.latest:
+            self.latest[key] = event
+
+    def inventory_complete(self) -> bool:
+        indexes = {key[1] for key in self.latest if key[0] in INVENTORY_EVENTS}
+        if not indexes or indexes != set(range(len(indexes))):
+            return False
+        return all((event_type, index) in self.latest for event_type in INVENTORY_EVENTS for index in indexes)
+
+    def complete(self) -> bool:
+        if self.mode == 'Node':
+            return ('consensus',) in self.latest
+
+        # The farm inventory is logged at farmer startup, nothing older belongs to the current run
+        if self.inventory_complete():
+            return True
+
+        if not self.farms:
+            return False
+        return ('piece cache',) in self.latest and all(('farm status', index) in self.latest for index in range(self.farms))
+
+    # Oldest first, so replaying them leaves every field at its newest value
+    def events(self):
+        return list(reversed(self.latest.values()))
+
+
+class LogBootstrap:
+    def __init__(self, log_path, name, mode, block_size=1024 * 1024, max_bytes=None, farms=None) -> None:
+        self.log_path = log_path
+        self.name = name
+        self.mode = mode
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+        self.tracker = StateTracker(mode, farms)
+
+        # Docker time of the newest line read, live streaming continues from there
+        self.since = None
+        self.lines = 0
+        self.bytes = 0
+
+    def run(self):
+        started = time.monotonic()
+        self.since = None
+
+        for line in read_lines_backward(self.log_path, self.block_size, self.max_bytes):
+            self.lines += 1
+            self.bytes += len(line) + 1
+
+            # Cheap keyword check on the json-file line before decoding it
+            if self.since is not None and KEY_EVENTS_PATTERN.search(line) is None:
+                continue
+
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+
+            if self.since is None:
+                self.since = Helpers.parse_event_datetime(entry.get('time')).timestamp()
+
+            event = LogParser.parse_raw_line(self.name, self.mode, entry.get('log', '').encode('utf-8'))
+            if event:
+                self.tracker.observe(event)
+                if self.tracker.complete():
+                    break
+
+        events = self.tracker.events()
+        logger.info(f'Bootstrapped {len(events)} state event(s) from {self.lines:,} lines ({self.bytes / 1024 / 1024:.1f} MB) in {time.monotonic() - started:.2f}s')
+        return events
@@ -1,12 +1,47 @@
 import src.constants as constants
 import datetime
 import re
-from src.logger import logger
+from src.logger import logger, hot_logger
 
 from typing import Dict
 from src.helpers import Helpers
 
+# Timestamp / level / data split for each container mode, run on raw bytes
+# Trailing whitespace is kept out of the data group instead of stripping the line
+LINE_PATTERNS_BYTES = {
+    'Farmer': re.compile(rb"^\s*(?P<timestamp>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}.\d+Z)\s*(?P<level>\w+)\s*(?P<data>.*?)\s*$"),
+    'Node': re.compile(rb'\s*(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+Z)\s+(\w+)\s+(.*?)\s*$')
+}
+
+# One pass over the raw line finds any key event keyword
+KEY_EVENTS_PATTERN = re.compile(b'|'.join(re.escape(keyword.encode('utf-8')) for keyword in constants.KEY_EVENTS))
+
 class LogParser:
+    # Parse a raw log line, only lines containing a key event are decoded
+    @staticmethod
+    def parse_raw_line(name, mode, log):
+        if KEY_EVENTS_PATTERN.search(log) is None:
+            return None
+
+        pattern = LINE_PATTERNS_BYTES.get(mode)
+        match = pattern.match(log) if pattern else None
+        if match is None:
+            return None
+
+        # Decode each field straight from the buffer without copying the line
+        view = memoryview(log)
+        timestamp, level, data = (str(view[match.start(group):match.end(group)], 'utf-8') for group in (1, 2, 3))
+
+        event = LogParser.get_log_event(name, timestamp, level, data)
+        if event is None:
+            hot_logger.warning('Unable to evaluate event. This happens when the parser cannot find a match for a known event', f'Unevaluated Data: {data}')
+            return None
+
+        if event.get('Event Type') == 'Unknown':
+            return None
+
+        return event
+
     def get_log_event(name, timestamp, level, data) -> Dict:
         event = None
 
@@ -1,16 +1,134 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import signal
+import threading
+import time
 
 os.makedirs('./logs/', exist_ok=True)
 
+LOG_FILE = './logs/app.log'
+
+formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+def create_file_handler(max_bytes=10 * 1024 * 1024, backup_count=5, rotate_when=None):
+    # Time based rotation when configured, size based otherwise
+    if rotate_when:
+        handler = logging.handlers.TimedRotatingFileHandler(LOG_FILE, when=rotate_when, backupCount=backup_count)
+    else:
+        handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=max_bytes, backupCount=backup_count)
+
+    handler.setFormatter(formatter)
+    return handler
+
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(formatter)
+
+# Records are handed to a queue and written to disk/stdout by a background listener thread
+log_queue = queue.Queue(-1)
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+listener = logging.handlers.QueueListener(log_queue, create_file_handler(), stream_handler, respect_handler_level=True)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
     handlers=[
-        logging.FileHandler('./logs/app.log'),  # Log to a file
-        logging.StreamHandler()
+        queue_handler
     ]
 )
 
-logger = logging.getLogger(__name__)
\ No newline at end of file
+listener.start()
+atexit.register(listener.stop)
+
+logger = logging.getLogger(__name__)
+
+# Apply the optional logging section of the config
+def configure_logging(config) -> None:
+    logging_config = config.get('logging') or {}
+
+    file_handler = create_file_handler(
+        max_bytes=logging_config.get('max_bytes', 10 * 1024 * 1024),
+        backup_count=logging_config.get('backup_count', 5),
+        rotate_when=logging_config.get('rotate_when')
+    )
+
+    listener.stop()
+    for handler in listener.handlers:
+        if handler is not stream_handler:
+            handler.close()
+    listener.handlers = (file_handler, stream_handler)
+    listener.start()
+
+    logging.getLogger().setLevel(logging_config.get('level', 'INFO'))
+    hot_logger.interval = logging_config.get('sample_interval', hot_logger.interval)
+
+# Worker processes log straight to stdout, the listener thread only lives in the parent
+def init_worker_logging() -> None:
+    # Ctrl-C is handled by the parent, which terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(stream_handler)
+
+
+class LogSampler:
+    def __init__(self, target, interval=60) -> None:
+        self.target = target
+        self.interval = interval
+        self.counts = {}
+        self.window_started = time.monotonic()
+        self.lock = threading.Lock()
+
+    # Count a repetitive message and log one summary line per message per interval
+    def info(self, message) -> None:
+        self._log(logging.INFO, message)
+
+    # The first occurrence per interval is logged right away with its detail, repeats are summarized
+    def warning(self, message, detail=None) -> None:
+        self._log(logging.WARNING, message, detail, immediate=True)
+
+    def _log(self, level, message, detail=None, immediate=False) -> None:
+        if not self.interval:
+            self._write(level, message, detail)
+            return
+
+        with self.lock:
+            key = (level, message)
+            count, _ = self.counts.get(key, (0, None))
+            first = count == 0
+            self.counts[key] = (count + 1, detail)
+            summary = None
+            if time.monotonic() - self.window_started >= self.interval:
+                summary = self._drain()
+
+        if immediate and first:
+            self._write(level, message, detail)
+        if summary:
+            self._emit(summary)
+
+    def flush(self) -> None:
+        with self.lock:
+            summary = self._drain()
+
+        self._emit(summary)
+
+    def _drain(self):
+        elapsed = time.monotonic() - self.window_started
+        counts, self.counts = self.counts, {}
+        self.window_started = time.monotonic()
+        return elapsed, counts
+
+    def _write(self, level, message, detail=None) -> None:
+        self.target.log(level, f'{message}: {detail}' if detail is not None else message)
+
+    def _emit(self, summary) -> None:
+        elapsed, counts = summary
+        for (level, message), (count, detail) in counts.items():
+            self._write(level, f'{message} ({count:,} in the last {elapsed:.0f}s)', detail if level > logging.INFO else None)
+
+hot_logger = LogSampler(logger)
+atexit.register(hot_logger.flush)
@@ -0,0 +1,65 @@
+import json
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class MockNodeRpcHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length))
+        calls = body if isinstance(body, list) else [body]
+
+        replies = [self.server.answer(call) for call in calls]
+        payload = json.dumps(replies if isinstance(body, list) else replies[0]).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+# Answers the substrate RPC methods the poller uses, the chain advances one block per poll
+class MockNodeRpcServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, best=1000, peers=40, syncing=False) -> None:
+        super().__init__(('127.0.0.1', port), MockNodeRpcHandler)
+        self.best = best
+        self.peers = peers
+        self.syncing = syncing
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self) -> None:
+        threading.Thread(target=self.serve_forever, name='mock-node-rpc', daemon=True).start()
+
+    def answer(self, call):
+        method = call.get('method')
+        with self.lock:
+            self.calls += 1
+
+            if method == 'system_health':
+                self.best += 1
+                result = {'peers': self.peers, 'isSyncing': self.syncing, 'shouldHavePeers': True}
+            elif method == 'system_syncState':
+                result = {'startingBlock': 0, 'currentBlock': self.best, 'highestBlock': self.best + (500 if self.syncing else 0)}
+            elif method == 'chain_getHeader':
+                params = call.get('params') or []
+                number = self.best - 100 if params else self.best
+                result = {'number': hex(number), 'parentHash': '0x00'}
+            elif method == 'chain_getFinalizedHead':
+                result = '0x' + 'ab' * 32
+            else:
+                return {'jsonrpc': '2.0', 'id': call.get('id'), 'error': {'code': -32601, 'message': 'Method not found'}}
+
+        return {'jsonrpc': '2.0', 'id': call.get('id'), 'result': result}
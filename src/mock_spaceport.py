@@ -0,0 +1,100 @@
+import collections
+import json
+import random
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.helpers import Helpers
+
+EVENT_PATHS = ['/nodeEvents', '/farmerEvents']
+
+class MockSpaceportHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _reply(self, status, body) -> None:
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length))
+
+    def do_GET(self) -> None:
+        if self.path in ['/nodes', '/farmers']:
+            self._reply(200, [])
+        else:
+            self._reply(404, {'error': 'Not found'})
+
+    def do_PUT(self) -> None:
+        self._read_body()
+        self._reply(200, {'message': 'Updated'})
+
+    def do_POST(self) -> None:
+        body = self._read_body()
+        server = self.server
+
+        # Injected latency and errors
+        if server.latency:
+            time.sleep(random.uniform(0, 2 * server.latency))
+
+        if server.error_rate and random.random() < server.error_rate:
+            server.record_error()
+            self._reply(500, {'error': 'Injected error'})
+            return
+
+        if self.path in EVENT_PATHS:
+            server.record_event(body)
+
+        self._reply(201, {'message': 'Inserted'})
+
+
+class MockSpaceportServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, error_rate=0.0) -> None:
+        super().__init__(('127.0.0.1', port), MockSpaceportHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+
+        self.lock = threading.Lock()
+        self.events = 0
+        self.errors = 0
+        self.lags = []
+
+        # Events per farmer or node name, shows which names a shard received
+        self.names = collections.Counter()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self) -> None:
+        threading.Thread(target=self.serve_forever, name='mock-spaceport', daemon=True).start()
+
+    # End-to-end lag is measured from the log timestamp of the event to its arrival here
+    def record_event(self, body) -> None:
+        lag = None
+        try:
+            lag = Helpers.get_event_lag({'Datetime': body.get('eventDatetime')})
+        except Exception:
+            pass
+
+        with self.lock:
+            self.events += 1
+            self.names[body.get('nodeName') or body.get('farmerName')] += 1
+            if lag is not None:
+                self.lags.append(lag)
+
+    def record_error(self) -> None:
+        with self.lock:
+            self.errors += 1
@@ -0,0 +1,127 @@
+import datetime
+import threading
+import time
+
+import requests
+
+from src.logger import logger, hot_logger
+
+class NodeRpcError(Exception):
+    pass
+
+
+class NodeRpcClient:
+    def __init__(self, url, timeout=5) -> None:
+        self.url = url
+        self.timeout = timeout
+
+        # One keep-alive connection for every poll
+        self.session = requests.Session()
+        self.next_id = 0
+
+    # Several calls share one HTTP round trip as a JSON-RPC batch
+    def batch(self, calls):
+        requests_body = []
+        for method, params in calls:
+            self.next_id += 1
+            requests_body.append({'jsonrpc': '2.0', 'id': self.next_id, 'method': method, 'params': params})
+
+        response = self.session.post(self.url, json=requests_body, timeout=self.timeout)
+        response.raise_for_status()
+
+        results = {item.get('id'): item for item in response.json()}
+        values = []
+        for request in requests_body:
+            item = results.get(request['id']) or {}
+            if 'error' in item or 'result' not in item:
+                raise NodeRpcError(f"{request['method']} failed: {item.get('error')}")
+            values.append(item['result'])
+
+        return values
+
+    def call(self, method, params=None):
+        return self.batch([(method, params or [])])[0]
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class NodeRpcPoller:
+    def __init__(self, url, node_name, publish, interval=10, timeout=5) -> None:
+        self.client = NodeRpcClient(url, timeout=timeout)
+        self.node_name = node_name
+        self.publish = publish
+        self.interval = interval
+
+        self.last_best = None
+        self.last_poll = None
+        self.running = False
+
+        # The RPC has no network speeds, they are carried over from the latest Idle Node log line
+        self.down_speed = 0.0
+        self.up_speed = 0.0
+
+    def start(self) -> None:
+        self.running = True
+        threading.Thread(target=self._poll_loop, name='node-rpc', daemon=True).start()
+        logger.info(f'Polling node RPC at {self.client.url} every {self.interval}s')
+
+    def stop(self) -> None:
+        self.running = False
+        self.client.close()
+
+    def _poll_loop(self) -> None:
+        while self.running:
+            started = time.monotonic()
+            try:
+                self.publish(self.poll())
+            except Exception as e:
+                hot_logger.info(f'Node RPC poll failed: {e}')
+
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def observe_log(self, event) -> None:
+        data = event.get('Data') or {}
+        if 'Down Speed' in data:
+            self.down_speed = data.get('Down Speed')
+            self.up_speed = data.get('Up Speed')
+
+    # Builds the same record the Idle Node log line produces, plus sync target and speed
+    def poll(self):
+        health, sync_state, best_header, finalized_hash = self.client.batch([
+            ('system_health', []),
+            ('system_syncState', []),
+            ('chain_getHeader', []),
+            ('chain_getFinalizedHead', [])
+        ])
+        finalized_header = self.client.call('chain_getHeader', [finalized_hash])
+
+        now = time.monotonic()
+        best = int(best_header['number'], 16)
+        finalized = int(finalized_header['number'], 16)
+
+        bps = 0.0
+        if self.last_best is not None and now > self.last_poll:
+            bps = max(0, best - self.last_best) / (now - self.last_poll)
+        self.last_best = best
+        self.last_poll = now
+
+        syncing = health.get('isSyncing')
+        return {
+            'Event Type': 'Syncing Node' if syncing else 'Idle Node',
+            'Level': 'INFO',
+            'Age': 0,
+            'Datetime': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S.%f'),
+            'Node Name': self.node_name,
+            'Data': {
+                'Status': 'Syncing' if syncing else 'Synced',
+                'Peers': health.get('peers', 0),
+                'Best': best,
+                'Target': sync_state.get('highestBlock') or best,
+                'Finalized': finalized,
+                'BPS': round(bps, 2),
+                'Down Speed': self.down_speed,
+                'Up Speed': self.up_speed,
+                'Source': 'RPC'
+            }
+        }
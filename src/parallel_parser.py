@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+import src.constants as constants
+
+from collections import deque
+from src.logger import logger, init_worker_logging
+from src.log_parser import LogParser
+
+# Runs inside a worker process, must stay importable at module level for pickling
+def parse_batch(name, mode, lines):
+    start = time.perf_counter()
+    events = []
+
+    for log in lines:
+        if log.startswith(constants.BROKEN_STREAM_LOG):
+            logger.error("Due to how log rotation works, the log stream is broken until you redeploy your container.")
+
+        try:
+            event = LogParser.parse_raw_line(name, mode, log)
+            if event:
+                events.append(event)
+        except Exception as e:
+            logger.error("Error evaluating log:", exc_info=e)
+
+    return os.getpid(), len(lines), time.perf_counter() - start, events
+
+
+class ParallelParser:
+    def __init__(self, name, mode, workers, batch_size=500, flush_interval=0.25, report_interval=60) -> None:
+        self.name = name
+        self.mode = mode
+        self.workers = workers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.report_interval = report_interval
+
+        # Bound the number of in flight batches so memory stays flat when the consumer falls behind
+        self.max_pending = workers * 4
+
+        self.pool = multiprocessing.Pool(processes=workers, initializer=init_worker_logging)
+
+        self.worker_stats = {}
+        self.batches = 0
+        self.batch_latency_total = 0.0
+        self.batch_latency_max = 0.0
+        self.last_report = time.monotonic()
+
+    def close(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
+
+    # Read raw lines on a thread so batches can be flushed on a timer while the stream is quiet
+    def _reader(self, generator, lines) -> None:
+        try:
+            for log in generator:
+                lines.put(log)
+        except Exception as e:
+            logger.error('Error reading log stream:', exc_info=e)
+        finally:
+            lines.put(None)
+
+    # Yield parsed events in log order
+    def parse_stream(self, generator):
+        lines = queue.Queue(maxsize=self.batch_size * self.max_pending)
+        reader = threading.Thread(target=self._reader, args=(generator, lines), name='log-reader', daemon=True)
+        reader.start()
+
+        pending = deque()
+        batch = []
+        batch_started = time.monotonic()
+        finished = False
+
+        while not finished or pending:
+            if not finished:
+                try:
+                    log = lines.get(timeout=self.flush_interval)
+                    if log is None:
+                        finished = True
+                    else:
+                        batch.append(log)
+                except queue.Empty:
+                    pass
+
+                now = time.monotonic()
+                if batch and (finished or len(batch) >= self.batch_size or now - batch_started >= self.flush_interval):
+                    result = self.pool.apply_async(parse_batch, (self.name, self.mode, batch))
+                    pending.append((now, result))
+                    batch = []
+                    batch_started = now
+
+            # Results are only released from the head of the queue, which keeps them in order
+            while pending and (pending[0][1].ready() or len(pending) >= self.max_pending or finished):
+                submitted, result = pending.popleft()
+                try:
+                    pid, count, elapsed, events = result.get()
+                except Exception as e:
+                    logger.error('Error parsing log batch:', exc_info=e)
+                    continue
+
+                self._record(pid, count, elapsed, time.monotonic() - submitted)
+                for event in events:
+                    yield event
+
+            self._report()
+
+    def _record(self, pid, count, elapsed, latency) -> None:
+        stats = self.worker_stats.setdefault(pid, {'lines': 0, 'busy': 0.0})
+        stats['lines'] += count
+        stats['busy'] += elapsed
+
+        self.batches += 1
+        self.batch_latency_total += latency
+        self.batch_latency_max = max(self.batch_latency_max, latency)
+
+    def _report(self) -> None:
+        now = time.monotonic()
+        if now - self.last_report < self.report_interval or not self.batches:
+            return
+
+        for pid, stats in self.worker_stats.items():
+            rate = stats['lines'] / stats['busy'] if stats['busy'] else 0
+            logger.info(f"Parser worker {pid}: {stats['lines']} lines, {rate:,.0f} lines/s")
+
+        average = self.batch_latency_total / self.batches * 1000
+        logger.info(f'Parser batches: {self.batches}, avg latency {average:.1f} ms, max latency {self.batch_latency_max * 1000:.1f} ms')
+
+        self.worker_stats = {}
+        self.batches = 0
+        self.batch_latency_total = 0.0
+        self.batch_latency_max = 0.0
+        self.last_report = now
@@ -0,0 +1,85 @@
+import json
+
+# Use orjson when it is installed, it encodes straight to bytes
+try:
+    import orjson
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    BACKEND = 'orjson'
+
+except ImportError:
+    encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+    def dumps(obj) -> bytes:
+        return encoder.encode(obj).encode('utf-8')
+
+    BACKEND = 'json'
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Request body layouts: (body key, event key) pairs, 'data' is added separately
+NODE_EVENT_LAYOUT = (
+    ('eventDatetime', 'Datetime'),
+    ('nodeName', 'Node Name'),
+    ('type', 'Event Type')
+)
+
+FARMER_EVENT_LAYOUT = (
+    ('eventDatetime', 'Datetime'),
+    ('farmerName', 'Farmer Name'),
+    ('type', 'Event Type')
+)
+
+# (body key, event Data key, default)
+CONSENSUS_DATA_LAYOUT = (
+    ('peers', 'Peers', 0),
+    ('best', 'Best', 0),
+    ('target', 'Target', 0),
+    ('finalized', 'Finalized', 0),
+    ('bps', 'BPS', 0),
+    ('downSpeed', 'Down Speed', 0),
+    ('upSpeed', 'Up Speed', 0)
+)
+
+class EventSerializer:
+    @staticmethod
+    def raw_event(event, layout) -> bytes:
+        body = {key: event.get(field) for key, field in layout}
+
+        # Spaceport stores the event payload as JSON text
+        body['data'] = dumps(event.get('Data')).decode('utf-8')
+        return dumps(body)
+
+    @staticmethod
+    def node_event(event) -> bytes:
+        return EventSerializer.raw_event(event, NODE_EVENT_LAYOUT)
+
+    @staticmethod
+    def farmer_event(event) -> bytes:
+        return EventSerializer.raw_event(event, FARMER_EVENT_LAYOUT)
+
+    @staticmethod
+    def consensus(event) -> bytes:
+        data = event.get('Data')
+        body = {
+            'consensusDatetime': event.get('Datetime'),
+            'nodeName': event.get('Node Name'),
+            'type': event.get('Event Type')
+        }
+
+        for key, field, default in CONSENSUS_DATA_LAYOUT:
+            body[key] = data.get(field, default)
+
+        return dumps(body)
+
+    @staticmethod
+    def claim(event) -> bytes:
+        data = event.get('Data')
+        return dumps({
+            'claimDatetime': event.get('Datetime'),
+            'nodeName': event.get('Node Name'),
+            'slot': data.get('Slot'),
+            'type': data.get('Type')
+        })
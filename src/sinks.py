@@ -0,0 +1,314 @@
+import json
+import os
+import sys
+
+from src.event_bus import Sink
+from src.logger import logger, hot_logger
+from src.spaceport_api import SpaceportAPI
+from src.spaceport_router import SpaceportRouter
+from src.keyed_executor import KeyedExecutor
+from src.helpers import Helpers
+
+class SpaceportSink(Sink):
+    name = 'spaceport'
+
+    def __init__(self, config, options=None) -> None:
+        options = dict(options or {})
+        options.setdefault('full_policy', 'block')
+        super().__init__(options)
+
+        # one or more endpoints, events are sharded by farmer or node name
+        self.router = SpaceportRouter(config)
+
+        # writes for different farms and nodes run in parallel, each key stays in order
+        self.executor = KeyedExecutor(
+            workers=options.get('concurrency', 8),
+            max_pending=options.get('max_pending', 1000),
+            name='spaceport'
+        )
+
+        # recently sent events, duplicates are skipped before any network I/O
+        self.dedup = config.get('dedup')
+        self.event_cache = self.create_event_cache(self.dedup)
+
+    @staticmethod
+    def create_event_cache(dedup):
+        dedup = dedup or {}
+        if not dedup.get('enabled', True):
+            return None
+
+        from src.event_cache import EventCache
+        return EventCache(
+            max_entries=dedup.get('max_entries', 100000),
+            horizon=dedup.get('horizon_hours', 24) * 3600,
+            bloom_path=dedup.get('bloom_path'),
+            bloom_capacity=dedup.get('bloom_capacity', 1000000),
+            bloom_horizon=dedup.get('bloom_horizon_hours', 7 * 24) * 3600
+        )
+
+    # The duplicate cache survives a reload unless its own settings changed
+    def reconfigure(self, config, rate_limiter) -> None:
+        self.router = SpaceportRouter(config)
+
+        if config.get('dedup') != self.dedup:
+            if self.event_cache:
+                self.event_cache.save()
+            self.dedup = config.get('dedup')
+            self.event_cache = self.create_event_cache(self.dedup)
+
+    def start(self) -> None:
+        self.executor.start()
+        super().start()
+
+    # Node events share the node's key so an Idle Node consensus insert follows its event,
+    # farmer events are ordered per farm
+    @staticmethod
+    def delivery_key(event):
+        if event.get('Node Name'):
+            return event.get('Node Name')
+
+        farm_index = (event.get('Data') or {}).get('Farm Index')
+        if farm_index is None:
+            return event.get('Farmer Name')
+        return (event.get('Farmer Name'), int(farm_index))
+
+    # Writes finish on the executor, so delivery and lag are recorded there instead of on submit
+    def write_items(self, batch) -> None:
+        for item in batch:
+            event = item[1]
+            if self.event_cache:
+                self.event_cache.report()
+                if self.event_cache.seen(event):
+                    hot_logger.info('Skipping duplicate event')
+                    self.record([item])
+                    continue
+
+            self.executor.submit(self.delivery_key(event), self.deliver, item)
+
+    def deliver(self, item) -> None:
+        inserted = None
+        try:
+            inserted = self.insert(item[1])
+        finally:
+            # Spaceport calls return None when the request failed
+            self.record([item], failed=inserted is None)
+
+    def insert(self, event):
+        base_url = self.router.route(event.get('Farmer Name') or event.get('Node Name'))
+        if event.get('Farmer Name'):
+            inserted = SpaceportAPI.insert_farmer_event(base_url, event)
+        elif event.get('Node Name'):
+            inserted = SpaceportAPI.insert_node_event(base_url, event)
+        else:
+            return False
+
+        # Spaceport answers 200 for events it already has, remember those too
+        if self.event_cache and inserted is not None:
+            self.event_cache.add(event)
+
+        if inserted and event.get('Node Name'):
+            hot_logger.info(f"Inserting {event['Event Type']}")
+
+            if event['Event Type'] in ['Idle Node', 'Syncing Node']:
+                SpaceportAPI.insert_consensus(base_url, event)
+                SpaceportAPI.update_node(base_url, {
+                    'name': event.get('Node Name'),
+                    'status': 'Idle' if event['Event Type'] == 'Idle Node' else 'Syncing'
+                })
+
+            elif event['Event Type'] in ['Vote', 'Block']:
+                SpaceportAPI.insert_claim(base_url, event)
+
+        return inserted
+
+    def close(self) -> None:
+        self.executor.shutdown()
+        if self.event_cache:
+            self.event_cache.save()
+
+    def metrics(self):
+        metrics = super().metrics()
+        metrics['executor'] = self.executor.metrics()
+        metrics['key_depth'] = self.executor.depth()
+        metrics['breakers'] = SpaceportAPI.breaker_status()
+        return metrics
+
+
+class DiscordSink(Sink):
+    name = 'discord'
+
+    def __init__(self, config, rate_limiter, options=None) -> None:
+        super().__init__(options)
+        self.config = config
+        self.rate_limiter = rate_limiter
+
+        discord_alerts = config.get('discord_alerts') or {}
+        self.publish_threshold = discord_alerts.get('publish_threshold', 5)
+
+        # optional digest windows per alert type, bursts are summarized into one message
+        self.digest_config = discord_alerts.get('digest')
+        self.digest = self.create_digest(self.digest_config)
+
+    def create_digest(self, digest_config):
+        if not digest_config:
+            return None
+
+        from src.alert_digest import AlertDigest
+        return AlertDigest(digest_config, self.send)
+
+    # Open digest windows are kept unless the digest settings changed, then they are sent first
+    def reconfigure(self, config, rate_limiter) -> None:
+        discord_alerts = config.get('discord_alerts') or {}
+        self.config = config
+        self.rate_limiter = rate_limiter
+        self.publish_threshold = discord_alerts.get('publish_threshold', 5)
+
+        if discord_alerts.get('digest') != self.digest_config:
+            old_digest = self.digest
+            self.digest_config = discord_alerts.get('digest')
+            self.digest = self.create_digest(self.digest_config)
+            if old_digest:
+                old_digest.close()
+
+    # Returns (alert type, title, message) for events worth a notification
+    def format_alert(self, event):
+        name = event.get('Farmer Name') or event.get('Node Name')
+        data = event.get('Data') or {}
+        event_type = event.get('Event Type')
+
+        if event_type == 'Reward':
+            return 'reward', 'Reward', f"{name} farm index {data.get('Farm Index')} Received a Reward"
+        elif event_type == 'Failed to Send Solution':
+            return 'reward', 'Failed to Send Solution', f"{name} farm index {data.get('Farm Index')} failed to send solution!"
+        elif event_type == 'Plotting Complete':
+            return 'plot', 'Plotting Complete', f"{name} farm index {data.get('Farm Index')} Plotting Complete"
+        elif event_type == 'Replotting Complete':
+            return 'farm', 'Replotting Complete', f"{name} farm index {data.get('Farm Index')} Replotting Complete"
+        elif event_type == 'Starting Workers':
+            return 'farmer', 'Starting Workers', f'{name} is starting.'
+        elif event_type in ['Vote', 'Block']:
+            return 'reward', f'Claimed {event_type}', f"{name} claimed {event_type.lower()} at slot {data.get('Slot')} for a reward."
+
+        return None
+
+    def write(self, event) -> None:
+        # Old events and anything replayed during catch-up are not announced
+        if event.get('Age', 0) >= self.publish_threshold or event.get('Catch Up'):
+            return
+
+        alert = self.format_alert(event)
+        if alert:
+            alert_type, title, message = alert
+            digest = self.digest
+            if digest and digest.add(event, alert_type):
+                return
+
+            self.send(alert_type, title, message)
+
+    def send(self, alert_type, title, message) -> None:
+        Helpers.send_discord_notification(self.config.get('discord_alerts'), title, message, alert_type, self.rate_limiter)
+
+    def tick(self) -> None:
+        digest = self.digest
+        if digest:
+            digest.flush_due()
+
+    def close(self) -> None:
+        if self.digest:
+            self.digest.close()
+
+
+class FileSink(Sink):
+    name = 'file'
+
+    def __init__(self, options=None) -> None:
+        options = dict(options or {})
+        options.setdefault('batch_size', 500)
+        options.setdefault('batch_wait', 1.0)
+        super().__init__(options)
+
+        self.path = options.get('path', './logs/events.jsonl')
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    # One write and flush per batch
+    def write_batch(self, events) -> None:
+        self.file.write(''.join(json.dumps(event) + '\n' for event in events))
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class StdoutSink(Sink):
+    name = 'stdout'
+
+    def __init__(self, options=None) -> None:
+        options = dict(options or {})
+        options.setdefault('batch_size', 100)
+        super().__init__(options)
+
+    def write_batch(self, events) -> None:
+        sys.stdout.write(''.join(json.dumps(event) + '\n' for event in events))
+        sys.stdout.flush()
+
+
+def get_sinks_config(config):
+    return config.get('sinks') or {'spaceport': {}}
+
+def create_sink(name, options, config, rate_limiter):
+    if name == 'spaceport':
+        return SpaceportSink(config, options)
+    elif name == 'discord':
+        return DiscordSink(config, rate_limiter, options)
+    elif name == 'file':
+        return FileSink(options)
+    elif name == 'stdout':
+        return StdoutSink(options)
+    elif name == 'aggregator':
+        from src.aggregator import AggregatorSink
+        return AggregatorSink(config, options)
+    elif name == 'feed':
+        from src.feed import FeedSink
+        return FeedSink(options)
+
+    logger.warning(f'Unknown sink {name} in config, skipping')
+    return None
+
+# Build the configured sinks, Spaceport only when no sinks section is given
+def create_sinks(config, rate_limiter):
+    sinks = []
+
+    for name, options in get_sinks_config(config).items():
+        options = options or {}
+        if options.get('enabled') is False:
+            continue
+
+        sink = create_sink(name, options, config, rate_limiter)
+        if sink:
+            sinks.append(sink)
+
+    return sinks
+
+# Sinks whose options are unchanged are reconfigured in place and keep their state,
+# only sinks with changed options are rebuilt
+def reconcile_sinks(sinks, old_config, config, rate_limiter):
+    current = {sink.name: sink for sink in sinks}
+    old_sinks_config = get_sinks_config(old_config)
+    result = []
+
+    for name, options in get_sinks_config(config).items():
+        options = options or {}
+        if options.get('enabled') is False:
+            continue
+
+        sink = current.get(name)
+        if sink is not None and (old_sinks_config.get(name) or {}) == options:
+            sink.reconfigure(config, rate_limiter)
+        else:
+            sink = create_sink(name, options, config, rate_limiter)
+
+        if sink:
+            result.append(sink)
+
+    return result
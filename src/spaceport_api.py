@@ -1,16 +1,89 @@
 import requests
-from src.logger import logger
+from src.logger import logger, hot_logger
 import uuid
 import random
-import json
+import time
+
+from src.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.serializer import EventSerializer, JSON_HEADERS
 
 class SpaceportAPI:
+    # Request settings, overridden by the optional spaceport_breaker config section
+    settings = {
+        'timeout': 10,
+        'failure_threshold': 5,
+        'reset_timeout': 30,
+        'max_retries': 2,
+        'backoff_base': 0.5,
+        'backoff_max': 8
+    }
+
+    # One breaker per Spaceport base url
+    breakers = {}
+
+    @staticmethod
+    def configure(config):
+        SpaceportAPI.settings.update(config.get('spaceport_breaker') or {})
+
+        for breaker in SpaceportAPI.breakers.values():
+            breaker.failure_threshold = SpaceportAPI.settings['failure_threshold']
+            breaker.reset_timeout = SpaceportAPI.settings['reset_timeout']
+
+    @staticmethod
+    def get_breaker(base_url):
+        breaker = SpaceportAPI.breakers.get(base_url)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                base_url,
+                failure_threshold=SpaceportAPI.settings['failure_threshold'],
+                reset_timeout=SpaceportAPI.settings['reset_timeout']
+            )
+            SpaceportAPI.breakers[base_url] = breaker
+        return breaker
+
+    @staticmethod
+    def breaker_status():
+        return {base_url: breaker.status() for base_url, breaker in SpaceportAPI.breakers.items()}
+
+    # Send a request through the circuit breaker, retrying connection errors and 5xx with backoff
+    @staticmethod
+    def request(base_url, method, url, **kwargs):
+        breaker = SpaceportAPI.get_breaker(base_url)
+        settings = SpaceportAPI.settings
+        attempt = 0
+
+        while True:
+            if not breaker.allow_request():
+                raise CircuitOpenError(f'Circuit open for {base_url}, skipping request')
+
+            try:
+                response = requests.request(method, url, timeout=settings['timeout'], **kwargs)
+                if response.status_code < 500:
+                    breaker.record_success()
+                    return response
+
+                error = Exception(f'HTTP {response.status_code}')
+
+            except requests.exceptions.RequestException as e:
+                error = e
+
+            # One logical request counts as one breaker failure, however many attempts it took,
+            # except a failed half-open trial which reopens the circuit right away
+            if attempt >= settings['max_retries'] or breaker.state == CircuitBreaker.HALF_OPEN:
+                breaker.record_failure()
+                raise error
+
+            # Exponential backoff with full jitter
+            delay = min(settings['backoff_max'], settings['backoff_base'] * (2 ** attempt))
+            time.sleep(random.uniform(0, delay))
+            attempt += 1
+
     # NODE
     @staticmethod
     def get_nodes(base_url):
         try:
             local_url = f'{base_url}/nodes'
-            response = requests.get(local_url)
+            response = SpaceportAPI.request(base_url, 'get', local_url)
             json_data = response.json()
 
             if response.status_code < 300:
@@ -19,6 +92,9 @@ class SpaceportAPI:
                 logger.error(f"S-API: Error getting nodes {json_data.get('error')}")
                 return None
 
+        except CircuitOpenError as e:
+            hot_logger.info(f'S-API: {e}')
+
         except Exception as e:
             logger.error(f'S-API: Error getting Nodes via Nexus API')
 
@@ -27,7 +103,7 @@ class SpaceportAPI:
         try:
             local_url = f'{base_url}/nodes'
 
-            response = requests.post(local_url, json=data)
+            response = SpaceportAPI.request(base_url, 'post', local_url, json=data)
             json_data = response.json()
 
             if response.status_code == 201:
@@ -35,6 +111,9 @@ class SpaceportAPI:
             else:
                 logger.error(f"S-API: Error inserting Node {json_data.get('error')}")
 
+        except CircuitOpenError as e:
+            hot_logger.info(f'S-API: {e}')
+
         except Exception as e:
             logger.error(f'S-API: Error inserting Node via Nexus API: {e}')
 
@@ -43,14 +122,17 @@ class SpaceportAPI:
         try:
             local_url = f"{base_url}/nodes/{data.get('name')}"
 
-            response = requests.put(local_url, json=data)
+            response = SpaceportAPI.request(base_url, 'put', local_url, json=data)
             json_data = response.json()
 
             if response.status_code == 200:
-                logger.info("S-API: Node Updated")
+                hot_logger.info("S-API: Node Updated")
             else:
                 logger.error(f"S-API: Error updating Node {json_data.get('error')}")
 
+        except CircuitOpenError as e:
+            hot_logger.info(f'S-API: {e}')
+
         except Exception as e:
             logger.error(f'S-API: Error updating Node')
 
@@ -60,26 +142,17 @@ class SpaceportAPI:
         try:
             local_url = f'{base_url}/consensus'
 
-            data = {
-                'consensusDatetime': event.get('Datetime'),
-                'nodeName': event.get('Node Name'),
-                'type': event.get('Event Type'),
-                'peers': event.get('Data').get('Peers', 0),
-                'best': event.get('Data').get('Best', 0),
-                'target': event.get('Data').get('Target', 0),
-                'finalized': event.get('Data').get('Finalized', 0),
-                'bps': event.get('Data').get('BPS', 0),
-                'downSpeed': event.get('Data').get('Down Speed', 0),
-                'upSpeed': event.get('Data').get('Up Speed', 0)
-            }
-
-            response = requests.post(local_url, json=data)
-            json_data = response.json()
+            body = EventSerializer.consensus(event)
+            response = SpaceportAPI.request(base_url, 'post', local_url, data=body, headers=JSON_HEADERS)
 
+            # Only parse the response body when it is going to be used
             if response.status_code == 201:
-                logger.info("S-API: Node Consensus Inserted")
+                hot_logger.info("S-API: Node Consensus Inserted")
             else:
-                logger.info(json_data)
+                logger.info(response.json())
+
+        except CircuitOpenError as e:
+            hot_logger.info(f'S-API: {e}')
 
         except Exception as e:
             logger.error(f'S-API: Error inserting Consensus via S-API: {e}')
@@ -89,21 +162,17 @@ class SpaceportAPI:
         try:
             local_url = f'{base_url}/claims'
 
-            data = {
-                'claimDatetime': event.get('Datetime'),
-                'nodeName': event.get('Node Name'),
-                'slot': event.get('Data').get('Slot'),
-                'type': event.get('Data').get('Type')
-            }
-
-            response = requests.post(local_url, json=data)
-            json_data = response.json()
+            body = EventSerializer.claim(event)
+            response = SpaceportAPI.request(base_url, 'post', local_url, data=body, headers=JSON_HEADERS)
 
             if response.status_code == 201:
-                logger.info("S-API: Claim Inserted")
+                hot_logger.info("S-API: Claim Inserted")
             else:
-                logger.info(json_data)
+                logger.info(response.json())
+
 
+        except CircuitOpenError as e:
+            hot_logger.info(f'S-API: {e}')
 
         except Exception as e:
             logger.error(f'S-API: Error inserting claim via S-API')
@@ -116,23 +185,20 @@ class SpaceportAPI:
         try:
             local_url = f'{base_url}/nodeEvents'
 
-            data = {
-                'eventDatetime': event.get('Datetime'),
-                'nodeName': event.get('Node Name'),
-                'type': event.get('Event Type'),
-                'data': json.dumps(event.get('Data'))
-            }
-
-            response = requests.post(local_url, json=data)
-            json_data = response.json()
+            body = EventSerializer.node_event(event)
+            response = SpaceportAPI.request(base_url, 'post', local_url, data=body, headers=JSON_HEADERS)
 
             if response.status_code == 201:
-                logger.info("S-API: Node Event Inserted")
+                hot_logger.info("S-API: Node Event Inserted")
                 return True
             elif response.status_code == 200:
-                logger.info(f"S-API: {json_data.get('message')}")
+                hot_logger.info(f"S-API: {response.json().get('message')}")
+                return False
             else:
-                logger.warn(f"S-API: Error inserting Node Event {json_data}")
+                logger.warn(f"S-API: Error inserting Node Event {response.json()}")
+
+        except CircuitOpenError as e:
+            hot_logger.info(f'S-API: {e}')
 
         except Exception as e:
             logger.error(f'S-API: Error inserting Node Event via Nexus API: {e}')
@@ -141,25 +207,22 @@ class SpaceportAPI:
         try:
             local_url = f'{base_url}/farmerEvents'
 
-            data = {
-                'eventDatetime': event.get('Datetime'),
-                'farmerName': event.get('Farmer Name'),
-                'type': event.get('Event Type'),
-                'data': json.dumps(event.get('Data'))
-            }
-
-            response = requests.post(local_url, json=data)
-            json_data = response.json()
+            body = EventSerializer.farmer_event(event)
+            response = SpaceportAPI.request(base_url, 'post', local_url, data=body, headers=JSON_HEADERS)
 
             if response.status_code == 201:
-                logger.info("S-API: Farmer Event Inserted")
+                hot_logger.info("S-API: Farmer Event Inserted")
                 return True
             
             elif response.status_code == 200:
-                logger.info(f"S-API: {json_data.get('message')}")
-                    
+                hot_logger.info(f"S-API: {response.json().get('message')}")
+                return False
+
             else:
-                logger.warn(f"S-API: Error inserting Farmer Event {json_data}")
+                logger.warn(f"S-API: Error inserting Farmer Event {response.json()}")
+
+        except CircuitOpenError as e:
+            hot_logger.info(f'S-API: {e}')
 
         except Exception as e:
             logger.error(f'S-API: Error inserting Farmer Event via Nexus API: {e}')
@@ -170,7 +233,7 @@ class SpaceportAPI:
     def get_farmers(base_url):
         try:
             local_url = f'{base_url}/farmers'
-            response = requests.get(local_url)
+            response = SpaceportAPI.request(base_url, 'get', local_url)
             json_data = response.json()
 
             if response.status_code < 300:
@@ -179,6 +242,9 @@ class SpaceportAPI:
                 logger.error(f"S-API: Error getting Farmers {json_data.get('error')}")
                 return None
 
+        except CircuitOpenError as e:
+            hot_logger.info(f'S-API: {e}')
+
         except Exception as e:
             logger.error(f'S-API: Error getting Farmers via Nexus API')
 
@@ -187,8 +253,8 @@ class SpaceportAPI:
         try:
             local_url = f'{base_url}/farmers'
 
-            logger.info(data)
-            response = requests.post(local_url, json=data)
+            logger.debug(data)
+            response = SpaceportAPI.request(base_url, 'post', local_url, json=data)
             json_data = response.json()
 
             if response.status_code == 201:
@@ -196,6 +262,9 @@ class SpaceportAPI:
             else:
                 logger.error(f"S-API: Error inserting Farmer {json_data}")
 
+        except CircuitOpenError as e:
+            hot_logger.info(f'S-API: {e}')
+
         except Exception as e:
             logger.error(f'S-API: Error inserting Farmer via Nexus API: {e}')
 
@@ -204,7 +273,7 @@ class SpaceportAPI:
         try:
             local_url = f"{base_url}/farmers/{data.get('name')}"
 
-            response = requests.put(local_url, json=data)
+            response = SpaceportAPI.request(base_url, 'put', local_url, json=data)
             json_data = response.json()
 
             if response.status_code == 200:
@@ -212,5 +281,8 @@ class SpaceportAPI:
             else:
                 logger.error(f"S-API: Error updating Farmer {json_data.get('error')}")
 
+        except CircuitOpenError as e:
+            hot_logger.info(f'S-API: {e}')
+
         except Exception as e:
             logger.error(f'S-API: Error updating Farmer')
\ No newline at end of file
@@ -0,0 +1,105 @@
+import bisect
+import hashlib
+
+from src.logger import logger, hot_logger
+from src.spaceport_api import SpaceportAPI
+
+def ring_hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    # Each endpoint is placed on the ring many times so keys spread evenly and only
+    # the keys of an added or removed endpoint move
+    def __init__(self, nodes=(), replicas=100) -> None:
+        self.replicas = replicas
+        self.nodes = []
+        self.hashes = []
+        self.owners = []
+
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node) -> None:
+        if node in self.nodes:
+            return
+
+        self.nodes.append(node)
+        for replica in range(self.replicas):
+            point = ring_hash(f'{node}#{replica}')
+            index = bisect.bisect(self.hashes, point)
+            self.hashes.insert(index, point)
+            self.owners.insert(index, node)
+
+    def remove(self, node) -> None:
+        if node not in self.nodes:
+            return
+
+        self.nodes.remove(node)
+        kept = [(point, owner) for point, owner in zip(self.hashes, self.owners) if owner != node]
+        self.hashes = [point for point, _ in kept]
+        self.owners = [owner for _, owner in kept]
+
+    # Distinct endpoints in ring order starting at the key, the first one owns the key
+    def preference(self, key):
+        if not self.hashes:
+            return []
+
+        index = bisect.bisect(self.hashes, ring_hash(key))
+        nodes = []
+        for offset in range(len(self.hashes)):
+            owner = self.owners[(index + offset) % len(self.hashes)]
+            if owner not in nodes:
+                nodes.append(owner)
+                if len(nodes) == len(self.nodes):
+                    break
+
+        return nodes
+
+
+class SpaceportRouter:
+    def __init__(self, config) -> None:
+        urls = config.get('spaceport_url')
+        if isinstance(urls, str):
+            urls = [urls]
+
+        sharding = config.get('spaceport_sharding') or {}
+        self.ring = HashRing(urls or [], replicas=sharding.get('replicas', 100))
+
+        # Names are few and the ring only changes with the config, so preferences are cached
+        self.preferences = {}
+        self.failed_over = set()
+
+        if len(self.ring.nodes) > 1:
+            logger.info(f'Sharding Spaceport writes across {len(self.ring.nodes)} endpoints')
+
+    @property
+    def urls(self):
+        return list(self.ring.nodes)
+
+    def preference(self, key):
+        nodes = self.preferences.get(key)
+        if nodes is None:
+            nodes = self.ring.preference(key or '')
+            self.preferences[key] = nodes
+        return nodes
+
+    # All writes for one farmer or node go to its owning endpoint, keeping their order,
+    # and move to the next endpoint on the ring only while its breaker is open
+    def route(self, key):
+        nodes = self.preference(key)
+        if not nodes:
+            return None
+
+        for url in nodes:
+            if SpaceportAPI.get_breaker(url).available():
+                if url != nodes[0]:
+                    self.failed_over.add(key)
+                    hot_logger.info(f'S-API: {nodes[0]} unavailable, routing {key} to {url}')
+                elif key in self.failed_over:
+                    self.failed_over.discard(key)
+                    logger.info(f'S-API: Routing {key} back to {url}')
+                return url
+
+        # Every endpoint is open, the request fails fast on the owner's breaker
+        return nodes[0]
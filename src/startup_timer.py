@@ -0,0 +1,24 @@
+import time
+
+from src.logger import logger
+
+class StartupTimer:
+    def __init__(self, started_at=None) -> None:
+        self.started_at = started_at or time.perf_counter()
+        self.last = self.started_at
+        self.stages = []
+
+    # Record the time spent since the previous mark
+    def mark(self, stage) -> None:
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+    def report(self) -> None:
+        total = self.last - self.started_at
+        logger.info('Startup timing:')
+
+        for stage, elapsed in self.stages:
+            logger.info(f'  {stage:<24} {elapsed * 1000:8.1f} ms')
+
+        logger.info(f"  {'total':<24} {total * 1000:8.1f} ms")
@@ -0,0 +1,333 @@
+import json
+import math
+import os
+import statistics
+import threading
+import time
+
+from array import array
+from itertools import compress
+from src.helpers import Helpers
+from src.logger import logger
+
+NAN = float('nan')
+
+def summarize(times, values):
+    if not values:
+        return {'count': 0}
+
+    # Cut points at every 5%, interpolated between samples
+    if len(values) > 1:
+        quantiles = statistics.quantiles(values, n=20, method='inclusive')
+        p50, p95 = quantiles[9], quantiles[18]
+    else:
+        p50 = p95 = values[0]
+
+    rate = None
+    if len(values) > 1 and times[-1] > times[0]:
+        rate = (values[-1] - values[0]) / (times[-1] - times[0])
+
+    return {
+        'count': len(values),
+        'last': values[-1],
+        'min': min(values),
+        'max': max(values),
+        'mean': math.fsum(values) / len(values),
+        'p50': p50,
+        'p95': p95,
+        'rate': rate
+    }
+
+
+class RawRing:
+    # Fixed-size ring of (time, value) samples backed by two flat arrays
+    def __init__(self, capacity) -> None:
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.head = 0
+        self.size = 0
+
+    def append(self, timestamp, value) -> None:
+        self.times[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    # Oldest first, the ring is unrolled with slice copies and filtered without a Python loop
+    # since samples may arrive out of order while catching up
+    def window(self, since):
+        if self.size < self.capacity:
+            times, values = self.times[:self.size], self.values[:self.size]
+        else:
+            times = self.times[self.head:] + self.times[:self.head]
+            values = self.values[self.head:] + self.values[:self.head]
+
+        keep = list(map(since.__le__, times))
+        return list(compress(times, keep)), list(compress(values, keep))
+
+
+class Tier:
+    # One slot per bucket of `resolution` seconds, bucket times are implicit so only the stats are stored
+    def __init__(self, resolution, capacity) -> None:
+        self.resolution = resolution
+        self.capacity = capacity
+        # Doubles keep block heights exact, float32 loses integers above 2^24
+        self.mean = array('d', [NAN]) * capacity
+        self.min = array('d', [NAN]) * capacity
+        self.max = array('d', [NAN]) * capacity
+        self.count = array('I', [0]) * capacity
+        self.head_bucket = None
+
+    def add(self, timestamp, value) -> None:
+        bucket = int(timestamp // self.resolution)
+
+        if self.head_bucket is None:
+            self.head_bucket = bucket
+        elif bucket > self.head_bucket:
+            # Clear the slots skipped over, at most one full turn of the ring
+            for skipped in range(max(self.head_bucket + 1, bucket - self.capacity + 1), bucket + 1):
+                slot = skipped % self.capacity
+                self.mean[slot] = self.min[slot] = self.max[slot] = NAN
+                self.count[slot] = 0
+            self.head_bucket = bucket
+        elif bucket <= self.head_bucket - self.capacity:
+            # Older than the ring covers
+            return
+
+        # Running mean, samples may arrive out of order while catching up
+        slot = bucket % self.capacity
+        count = self.count[slot] + 1
+        self.count[slot] = count
+        if count == 1:
+            self.mean[slot] = self.min[slot] = self.max[slot] = value
+        else:
+            self.mean[slot] += (value - self.mean[slot]) / count
+            self.min[slot] = min(self.min[slot], value)
+            self.max[slot] = max(self.max[slot], value)
+
+    # Buckets from since to the head are a contiguous run of slots, copied in at most two slices
+    def window(self, since):
+        if self.head_bucket is None:
+            return [], [], [], []
+
+        first = max(int(since // self.resolution), self.head_bucket - self.capacity + 1)
+        if first > self.head_bucket:
+            return [], [], [], []
+
+        start = first % self.capacity
+        end = self.head_bucket % self.capacity + 1
+
+        def run(values):
+            return values[start:end] if start < end else values[start:] + values[:end]
+
+        keep = run(self.count)
+        times = range(first * self.resolution, (self.head_bucket + 1) * self.resolution, self.resolution)
+        return tuple(list(compress(values, keep)) for values in (times, run(self.mean), run(self.min), run(self.max)))
+
+
+class Series:
+    def __init__(self, raw_capacity=3600, minute_capacity=7 * 24 * 60, hour_capacity=90 * 24) -> None:
+        self.raw = RawRing(raw_capacity)
+        self.tiers = [Tier(60, minute_capacity), Tier(3600, hour_capacity)]
+
+    # Every tier sees every sample, so downsampled means, minimums and maximums are exact
+    def add(self, timestamp, value) -> None:
+        self.raw.append(timestamp, value)
+        for tier in self.tiers:
+            tier.add(timestamp, value)
+
+    def stats(self, window, now=None):
+        now = now or time.time()
+        since = now - window
+
+        # The raw ring answers short windows, longer ones use the finest tier that still covers them
+        raw_times, raw_values = self.raw.window(since)
+        if self.raw.size < self.raw.capacity or (raw_times and raw_times[0] - since < 60):
+            stats = summarize(raw_times, raw_values)
+            stats['resolution'] = 0
+            return stats
+
+        for tier in self.tiers:
+            if tier.resolution * tier.capacity >= window or tier is self.tiers[-1]:
+                times, means, mins, maxs = tier.window(since)
+                stats = summarize(times, means)
+                if mins:
+                    stats['min'] = min(mins)
+                    stats['max'] = max(maxs)
+                stats['resolution'] = tier.resolution
+                return stats
+
+    def arrays(self):
+        yield self.raw.times
+        yield self.raw.values
+        for tier in self.tiers:
+            yield tier.mean
+            yield tier.min
+            yield tier.max
+            yield tier.count
+
+    def state(self):
+        return {
+            'raw': [self.raw.capacity, self.raw.head, self.raw.size],
+            'tiers': [[tier.resolution, tier.capacity, tier.head_bucket] for tier in self.tiers],
+            'typecodes': ''.join(values.typecode for values in self.arrays())
+        }
+
+    def memory(self) -> int:
+        return sum(len(values) * values.itemsize for values in self.arrays())
+
+
+class MetricsStore:
+    def __init__(self, config=None) -> None:
+        config = config or {}
+        self.path = config.get('path')
+        self.raw_capacity = config.get('raw_samples', 3600)
+        self.minute_capacity = config.get('minute_buckets', 7 * 24 * 60)
+        self.hour_capacity = config.get('hour_buckets', 90 * 24)
+        self.snapshot_interval = config.get('snapshot_interval', 300)
+
+        # Periodic log of every series over the summary window, 0 turns it off
+        self.summary_interval = config.get('summary_interval', 300)
+        self.summary_window = config.get('summary_window', 3600)
+
+        self.series = {}
+        self.lock = threading.Lock()
+        self.running = False
+
+        if self.path and os.path.exists(self.path):
+            try:
+                self.restore(self.path)
+            except Exception as e:
+                logger.warning(f'Unable to restore metrics from {self.path}: {e}')
+
+    def get(self, name):
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = Series(self.raw_capacity, self.minute_capacity, self.hour_capacity)
+        return series
+
+    def add(self, name, timestamp, value) -> None:
+        with self.lock:
+            self.get(name).add(timestamp, float(value))
+
+    # Consensus values per node and plot percentage per farm, timed by the log timestamp
+    def observe(self, event) -> None:
+        event_type = event.get('Event Type')
+        data = event.get('Data') or {}
+
+        if event_type in ['Idle Node', 'Syncing Node']:
+            prefix = event.get('Node Name')
+            fields = ['Peers', 'Best', 'Finalized', 'Down Speed', 'Up Speed']
+        elif event_type in ['Plotting Sector', 'Replotting Sector'] and data.get('Farm Index') is not None:
+            prefix = f"{event.get('Farmer Name')}.farm{data.get('Farm Index')}"
+            fields = ['Plot Percentage']
+        else:
+            return
+
+        try:
+            timestamp = Helpers.parse_event_datetime(event.get('Datetime')).timestamp()
+        except Exception:
+            timestamp = time.time()
+
+        with self.lock:
+            for field in fields:
+                if data.get(field) is not None:
+                    self.get(f"{prefix}.{field.lower().replace(' ', '_')}").add(timestamp, float(data[field]))
+
+    # Snapshots are written from their own thread so the log stream never waits on disk
+    def start(self) -> None:
+        self.running = True
+
+        if self.path and self.snapshot_interval:
+            threading.Thread(target=self._snapshot_loop, name='metrics-snapshot', daemon=True).start()
+
+        if self.summary_interval:
+            threading.Thread(target=self._summary_loop, name='metrics-summary', daemon=True).start()
+
+    def stop(self) -> None:
+        self.running = False
+
+    def _snapshot_loop(self) -> None:
+        while self.running:
+            time.sleep(self.snapshot_interval)
+            if self.running:
+                self.snapshot(self.path)
+
+    def _summary_loop(self) -> None:
+        while self.running:
+            time.sleep(self.summary_interval)
+            if self.running:
+                try:
+                    self.report()
+                except Exception as e:
+                    logger.error('Error reporting metrics:', exc_info=e)
+
+    def report(self) -> None:
+        with self.lock:
+            names = sorted(self.series)
+
+        for name in names:
+            stats = self.stats(name, self.summary_window)
+            if not stats or not stats['count']:
+                continue
+
+            rate = f", {stats['rate']:+.3g}/s" if stats['rate'] is not None else ''
+            logger.info(f"Metrics {name} over {self.summary_window}s: last {stats['last']:g}, mean {stats['mean']:.2f}, p95 {stats['p95']:.2f}, min {stats['min']:g}, max {stats['max']:g}{rate}")
+
+        logger.info(f'Metrics: {len(names)} series in {self.memory() / 1024:.0f} KiB')
+
+    def stats(self, name, window):
+        with self.lock:
+            series = self.series.get(name)
+            return series.stats(window) if series else None
+
+    def memory(self) -> int:
+        with self.lock:
+            return sum(series.memory() for series in self.series.values())
+
+    # Header line with the ring positions, then the raw array bytes of every series in order
+    def snapshot(self, path) -> None:
+        try:
+            # Copy under the lock, write without it
+            with self.lock:
+                header = {name: series.state() for name, series in self.series.items()}
+                arrays = [values[:] for series in self.series.values() for values in series.arrays()]
+
+            temp_path = f'{path}.tmp'
+            with open(temp_path, 'wb') as file:
+                file.write(json.dumps(header).encode('utf-8') + b'\n')
+                for values in arrays:
+                    values.tofile(file)
+            os.replace(temp_path, path)
+
+        except Exception as e:
+            logger.warning(f'Unable to save metrics to {path}: {e}')
+
+    def restore(self, path) -> None:
+        with open(path, 'rb') as file:
+            header = json.loads(file.readline())
+            series_map = {}
+
+            for name, state in header.items():
+                raw_capacity, head, size = state['raw']
+                (minute_resolution, minute_capacity, minute_head), (hour_resolution, hour_capacity, hour_head) = state['tiers']
+
+                series = Series(raw_capacity, minute_capacity, hour_capacity)
+                if state.get('typecodes') != series.state()['typecodes']:
+                    raise ValueError('snapshot was written with a different value layout')
+
+                for values in series.arrays():
+                    length = len(values)
+                    del values[:]
+                    values.fromfile(file, length)
+
+                series.raw.head, series.raw.size = head, size
+                series.tiers[0].head_bucket = minute_head
+                series.tiers[1].head_bucket = hour_head
+                series_map[name] = series
+
+        # Capacities come from the snapshot, new series use the configured ones
+        with self.lock:
+            self.series = series_map
+        logger.info(f'Restored {len(series_map)} metric series from {path}')
@@ -0,0 +1,107 @@
+import threading
+import time
+
+from src.helpers import Helpers
+from src.logger import logger
+
+# Progress and consensus events where only the latest value matters while catching up
+COALESCED_EVENTS = {
+    'Plotting Sector': 'Farm Index',
+    'Replotting Sector': 'Farm Index',
+    'Piece Cache Sync': None,
+    'Idle Node': None,
+    'Syncing Node': None
+}
+
+class LagWatermark:
+    def __init__(self, config) -> None:
+        self.configure(config)
+
+        # Most recent log timestamp seen, in epoch seconds
+        self.watermark = None
+        self.lag = 0.0
+        self.catching_up = False
+
+        self.coalesced = {}
+        self.last_flush = time.monotonic()
+        self.running = False
+
+    def configure(self, config) -> None:
+        catch_up = config.get('catch_up') or {}
+        self.enter_lag = catch_up.get('enter_lag_seconds', 300)
+        self.exit_lag = catch_up.get('exit_lag_seconds', 60)
+        self.coalesce_interval = catch_up.get('coalesce_interval', 30)
+
+    # Returns True when the mode changed
+    def observe(self, event) -> bool:
+        try:
+            event_time = Helpers.parse_event_datetime(event.get('Datetime')).timestamp()
+        except Exception:
+            return False
+
+        if self.watermark is None or event_time > self.watermark:
+            self.watermark = event_time
+        self.lag = time.time() - self.watermark
+
+        # Separate enter and exit thresholds so the mode does not flap around a single value
+        if not self.catching_up and self.lag > self.enter_lag:
+            self.catching_up = True
+            logger.warning(f'Log stream is {self.lag:.0f}s behind, switching to catch-up mode')
+            return True
+
+        if self.catching_up and self.lag < self.exit_lag:
+            self.catching_up = False
+            logger.info(f'Log stream caught up ({self.lag:.0f}s behind), switching to live mode')
+            return True
+
+        return False
+
+    # Hold back superseded progress updates, returns True when the event was absorbed
+    def coalesce(self, event) -> bool:
+        event_type = event.get('Event Type')
+        if event_type not in COALESCED_EVENTS:
+            return False
+
+        field = COALESCED_EVENTS[event_type]
+        name = event.get('Farmer Name') or event.get('Node Name')
+        key = (event_type, name, (event.get('Data') or {}).get(field) if field else None)
+        self.coalesced[key] = event
+        return True
+
+    # Held updates of the same node or farm go out ahead of any other event of it, so they are not overtaken
+    def release(self, event):
+        if not self.coalesced:
+            return []
+
+        name = event.get('Farmer Name') or event.get('Node Name')
+        farm_index = (event.get('Data') or {}).get('Farm Index')
+        keys = [
+            key for key in self.coalesced
+            if key[1] == name and (farm_index is None or key[2] is None or str(key[2]) == str(farm_index))
+        ]
+        return [self.coalesced.pop(key) for key in keys]
+
+    def due(self) -> bool:
+        return bool(self.coalesced) and time.monotonic() - self.last_flush >= self.coalesce_interval
+
+    def drain(self):
+        events = list(self.coalesced.values())
+        self.coalesced = {}
+        self.last_flush = time.monotonic()
+        return events
+
+    # A stream that goes quiet while catching up would hold its last updates forever without the timer
+    def start(self, flush) -> None:
+        self.running = True
+        threading.Thread(target=self._flush_loop, args=(flush,), name='coalesce-flush', daemon=True).start()
+
+    def stop(self) -> None:
+        self.running = False
+
+    def _flush_loop(self, flush) -> None:
+        while self.running:
+            time.sleep(min(1.0, self.coalesce_interval))
+            try:
+                flush()
+            except Exception as e:
+                logger.error('Error flushing coalesced events:', exc_info=e)
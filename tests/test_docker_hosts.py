@@ -0,0 +1,60 @@
+import threading
+import time
+
+from src.docker_hosts import DockerHostSupervisor
+from src.fake_docker import FakeDockerClient, FakeLogSource
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_missing_container_leaves_sibling_stream_running():
+    # The host only runs a farmer, the node target next to it has no container
+    source = FakeLogSource('Farmer', rate=200, duration=10)
+    clients = []
+
+    def client_factory(host_config):
+        clients.append(FakeDockerClient('Farmer', source))
+        return clients[-1]
+
+    events = []
+    lock = threading.Lock()
+
+    def handle_event(event):
+        with lock:
+            events.append(event)
+
+    hosts_config = [{
+        'name': 'host-1',
+        'url': 'tcp://host-1:2376',
+        'containers': [
+            {'name': 'farmer-1', 'mode': 'Farmer'},
+            {'name': 'node-1', 'mode': 'Node'}
+        ]
+    }]
+    supervisor = DockerHostSupervisor(hosts_config, handle_event, lambda target: None, client_factory=client_factory, retry_delay=0.05)
+    host = supervisor.hosts[0]
+    supervisor.start()
+
+    try:
+        assert wait_for(lambda: len(events) > 20)
+        client = host.client
+
+        # Many missing-container retries later the farmer stream keeps going on the same client
+        time.sleep(1)
+        with lock:
+            seen = len(events)
+        assert wait_for(lambda: len(events) > seen + 20)
+
+        assert len(clients) == 1
+        assert host.client is client
+        assert host.failures == 0
+        assert all(event['Farmer Name'] == 'farmer-1' for event in events)
+
+    finally:
+        supervisor.stop()
@@ -0,0 +1,61 @@
+import pytest
+
+from src.hubble import Hubble
+from src.mock_node_rpc import MockNodeRpcServer
+from src.node_rpc import NodeRpcPoller
+
+def idle_log_event(down_speed, up_speed):
+    return {
+        'Event Type': 'Idle Node',
+        'Level': 'INFO',
+        'Age': 0,
+        'Datetime': '2026-01-01 00:00:00',
+        'Node Name': 'node-1',
+        'Data': {'Status': 'Synced', 'Peers': 40, 'Best': 1000, 'Finalized': 900, 'Down Speed': down_speed, 'Up Speed': up_speed}
+    }
+
+@pytest.fixture
+def rpc_server():
+    server = MockNodeRpcServer()
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def hubble(rpc_server):
+    hubble = Hubble({'mode': 'Node', 'name': 'node-1', 'sinks': {'stdout': {}}}, docker_client=object())
+    published = []
+    hubble.event_bus.publish = published.append
+    hubble.node_poller = NodeRpcPoller(rpc_server.url, 'node-1', hubble.dispatch_event)
+    yield hubble, published
+    hubble.node_poller.stop()
+
+
+def test_polled_event_reads_chain_state(rpc_server):
+    poller = NodeRpcPoller(rpc_server.url, 'node-1', None)
+    event = poller.poll()
+
+    assert event['Event Type'] == 'Idle Node'
+    assert event['Data']['Source'] == 'RPC'
+    assert event['Data']['Peers'] == 40
+    assert event['Data']['Finalized'] == event['Data']['Best'] - 100
+    poller.stop()
+
+
+def test_polled_event_keeps_speeds_from_the_log(hubble):
+    hubble, published = hubble
+
+    # Before any log line there is nothing to carry over
+    hubble.node_poller.publish(hubble.node_poller.poll())
+    assert published[-1]['Data']['Down Speed'] == 0.0
+
+    # The log line itself is dropped, its speeds go out with the next polled event
+    hubble.handle_event(idle_log_event(12.5, 3.0))
+    assert len(published) == 1
+
+    hubble.node_poller.publish(hubble.node_poller.poll())
+    assert len(published) == 2
+    assert published[-1]['Data']['Source'] == 'RPC'
+    assert published[-1]['Data']['Down Speed'] == 12.5
+    assert published[-1]['Data']['Up Speed'] == 3.0
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from src.mock_spaceport import MockSpaceportServer
+from src.spaceport_api import SpaceportAPI
+from src.spaceport_router import SpaceportRouter
+
+NAMES = [f'node-{i}' for i in range(600)]
+
+def node_event(name):
+    return {'Datetime': '2026-01-01 00:00:00', 'Node Name': name, 'Event Type': 'Idle Node', 'Data': {}}
+
+@pytest.fixture
+def servers():
+    servers = [MockSpaceportServer() for _ in range(3)]
+    for server in servers:
+        server.start()
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def fast_breakers(monkeypatch):
+    for key, value in {'failure_threshold': 1, 'reset_timeout': 0.3, 'max_retries': 0, 'timeout': 2}.items():
+        monkeypatch.setitem(SpaceportAPI.settings, key, value)
+
+
+def test_adding_a_shard_moves_about_a_third_of_names(servers):
+    two = SpaceportRouter({'spaceport_url': [server.url for server in servers[:2]]})
+    three = SpaceportRouter({'spaceport_url': [server.url for server in servers]})
+
+    for name in NAMES:
+        assert SpaceportAPI.insert_node_event(three.route(name), node_event(name))
+
+    moved = [name for name in NAMES if two.route(name) != three.route(name)]
+
+    # Only names taken over by the new shard move, the others keep their owner
+    assert set(moved) == set(servers[2].names)
+    assert 0.2 < len(moved) / len(NAMES) < 0.45
+
+    for server in servers:
+        assert sum(server.names.values()) == server.events
+
+
+def test_open_breaker_fails_over_and_recovers(servers, fast_breakers):
+    failing, *_ = servers
+    router = SpaceportRouter({'spaceport_url': [server.url for server in servers]})
+    owned = [name for name in NAMES if router.route(name) == failing.url][:20]
+    standby = {name: router.preference(name)[1] for name in owned}
+
+    # The first failed write opens the owner's breaker
+    failing.error_rate = 1.0
+    assert SpaceportAPI.insert_node_event(router.route(owned[0]), node_event(owned[0])) is None
+    assert SpaceportAPI.get_breaker(failing.url).state == 'open'
+
+    # While it is open the names go to the next endpoint on the ring
+    for name in owned:
+        url = router.route(name)
+        assert url == standby[name]
+        assert SpaceportAPI.insert_node_event(url, node_event(name))
+
+    received = {server.url: server.names for server in servers}
+    assert all(received[standby[name]][name] == 1 for name in owned)
+    assert not failing.names
+
+    # After the reset timeout a successful trial closes the breaker and the names move back
+    failing.error_rate = 0.0
+    time.sleep(0.4)
+    for name in owned:
+        url = router.route(name)
+        assert url == failing.url
+        assert SpaceportAPI.insert_node_event(url, node_event(name))
+
+    assert SpaceportAPI.get_breaker(failing.url).state == 'closed'
+    assert set(failing.names) == set(owned)
+    assert not router.failed_over